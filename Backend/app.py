@@ -1,14 +1,41 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, stream_with_context, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload, load_only
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
 from flask_migrate import Migrate
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.http import is_resource_modified
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time, timezone
 from functools import wraps
 import os
 import json
+import hashlib
+import logging
+import base64
+import html
+import re
+import math
+import csv
+import io
+import zlib
+from types import SimpleNamespace
+import click
+from collections import Counter, deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from time import perf_counter
+
+from cache import TTLCache, VersionedCache, LocalCacheBackend, RedisCacheBackend
+from jobs import JobQueue, DatabaseJobBackend, InlineJobBackend
+from events import EventBus, BusFull, DatabaseEventBackend, LocalEventBackend
+from reply_templates import TemplateIndex, compile_template, unknown_placeholders
+import sentiment as sentiment_engine
+from database import DEFAULT_SQLITE_PRAGMAS, RoutingSession, configure_engines, pool_options
+from metrics import Registry, QUERY_COUNT_BUCKETS
+from passwords import PasswordHasher, HasherBusy, DEFAULT_METHOD as DEFAULT_PASSWORD_HASH_METHOD
 
 # Load environment variables
 load_dotenv()
@@ -19,15 +46,107 @@ app = Flask(__name__)
 _db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'review_system.db').replace('\\', '/')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f'sqlite:///{_db_path}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Connection pool for server databases (see database.py); SQLite ignores these
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = pool_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    size=int(os.getenv('DB_POOL_SIZE', '5')),
+    max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    pre_ping=os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    timeout=int(os.getenv('DB_POOL_TIMEOUT', '30'))
+)
+# Optional read replica for list/analytics/export reads. Reads fall back to the
+# primary once the replica has been behind for more than REPLICA_MAX_LAG seconds
+# (0: whenever it is behind for the branches a request reads)
+app.config['SQLALCHEMY_BINDS'] = {}
+if os.getenv('REPLICA_DATABASE_URL'):
+    app.config['SQLALCHEMY_BINDS']['replica'] = os.getenv('REPLICA_DATABASE_URL')
+app.config['REPLICA_MAX_LAG'] = float(os.getenv('REPLICA_MAX_LAG', '0'))
+# Per-connection SQLite pragmas; SQLITE_TUNING=0 keeps SQLite's own defaults
+app.config['SQLITE_PRAGMAS'] = dict(
+    DEFAULT_SQLITE_PRAGMAS,
+    journal_mode=os.getenv('SQLITE_JOURNAL_MODE', DEFAULT_SQLITE_PRAGMAS['journal_mode']),
+    synchronous=os.getenv('SQLITE_SYNCHRONOUS', DEFAULT_SQLITE_PRAGMAS['synchronous']),
+    busy_timeout=int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', DEFAULT_SQLITE_PRAGMAS['busy_timeout'])),
+    mmap_size=int(os.getenv('SQLITE_MMAP_SIZE', DEFAULT_SQLITE_PRAGMAS['mmap_size'])),
+    cache_size=int(os.getenv('SQLITE_CACHE_SIZE', DEFAULT_SQLITE_PRAGMAS['cache_size']))
+) if os.getenv('SQLITE_TUNING', '1') == '1' else {}
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=30)
+# Rows per INSERT transaction for POST /api/reviews/bulk
+app.config['BULK_INSERT_CHUNK_SIZE'] = int(os.getenv('BULK_INSERT_CHUNK_SIZE', '500'))
+# Most reviews one POST /api/reviews/batch may moderate
+app.config['BATCH_MODERATION_LIMIT'] = int(os.getenv('BATCH_MODERATION_LIMIT', '500'))
+# Rows fetched per round trip (and per response chunk) by GET /api/reviews/export
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+# Dashboard/trends response cache; set ANALYTICS_CACHE_URL=redis://... to
+# share it between workers
+app.config['ANALYTICS_CACHE_TTL'] = int(os.getenv('ANALYTICS_CACHE_TTL', '300'))
+app.config['ANALYTICS_CACHE_SIZE'] = int(os.getenv('ANALYTICS_CACHE_SIZE', '1024'))
+app.config['ANALYTICS_CACHE_URL'] = os.getenv('ANALYTICS_CACHE_URL')
+# Background jobs: 'database' queues post-commit work for `flask worker`,
+# 'inline' runs it inside the request transaction
+app.config['JOB_BACKEND'] = os.getenv('JOB_BACKEND', 'database')
+app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+# Live review events (GET /api/stream): 'database' relays them between workers
+# through the stream_events table, 'local' only within one process
+app.config['EVENTS_BACKEND'] = os.getenv('EVENTS_BACKEND', 'database')
+app.config['EVENTS_POLL_INTERVAL'] = float(os.getenv('EVENTS_POLL_INTERVAL', '1'))
+app.config['EVENTS_RETENTION'] = int(os.getenv('EVENTS_RETENTION', '3600'))
+# Each open stream holds a server thread; keep this below gunicorn --threads
+app.config['EVENTS_MAX_SUBSCRIBERS'] = int(os.getenv('EVENTS_MAX_SUBSCRIBERS', '24'))
+# Undelivered events a stream may fall behind by before it is reset
+app.config['EVENTS_MAX_PENDING'] = int(os.getenv('EVENTS_MAX_PENDING', '100'))
+app.config['EVENTS_HEARTBEAT'] = float(os.getenv('EVENTS_HEARTBEAT', '15'))
+# Seconds a stream token may be used to open /api/stream; it travels in the URL
+app.config['STREAM_TOKEN_EXPIRES'] = int(os.getenv('STREAM_TOKEN_EXPIRES', '60'))
+# Seconds a review-list COUNT(*) may be reused before it is recomputed
+app.config['REVIEW_COUNT_CACHE_TTL'] = int(os.getenv('REVIEW_COUNT_CACHE_TTL', '30'))
+# Seconds another process may keep suggesting templates from before an edit
+app.config['TEMPLATE_INDEX_TTL'] = int(os.getenv('TEMPLATE_INDEX_TTL', '60'))
+# Seconds another process may keep honouring a token after its scope was revoked
+app.config['SCOPE_CACHE_TTL'] = int(os.getenv('SCOPE_CACHE_TTL', '60'))
+# Password hashing runs in a per-worker process pool; calls beyond
+# PASSWORD_HASH_MAX_PENDING get a 429. Changing the method rehashes on login.
+app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', DEFAULT_PASSWORD_HASH_METHOD)
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '16'))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+# Statements slower than this are logged with the route that issued them
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', '200'))
 
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+with app.app_context():
+    configure_engines(db.engines.values(), app.config['SQLITE_PRAGMAS'])
 migrate = Migrate(app, db)
 jwt = JWTManager(app)
 CORS(app)
 
+review_count_cache = TTLCache(maxsize=2048, ttl=app.config['REVIEW_COUNT_CACHE_TTL'])
+# Branch scope -> when the replica was first seen behind the primary for it
+replica_lag_cache = TTLCache(maxsize=1024, ttl=3600)
+access_scope_cache = TTLCache(maxsize=4096, ttl=app.config['SCOPE_CACHE_TTL'])
+# Active reply templates by (category, sentiment_type) for suggestions
+template_index = TemplateIndex(
+    lambda: [t.to_dict() for t in ReplyTemplate.query.filter_by(is_active=True).order_by(ReplyTemplate.id)],
+    ttl=app.config['TEMPLATE_INDEX_TTL']
+)
+password_hasher = PasswordHasher(
+    app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
+
+if app.config['ANALYTICS_CACHE_URL']:
+    _analytics_cache_backend = RedisCacheBackend(app.config['ANALYTICS_CACHE_URL'])
+else:
+    _analytics_cache_backend = LocalCacheBackend(
+        maxsize=app.config['ANALYTICS_CACHE_SIZE'], ttl=app.config['ANALYTICS_CACHE_TTL']
+    )
+analytics_cache = VersionedCache(_analytics_cache_backend, ttl=app.config['ANALYTICS_CACHE_TTL'])
+
 # ============ DATABASE MODELS ============
 
 class User(db.Model):
@@ -40,6 +159,8 @@ class User(db.Model):
     role = db.Column(db.String(50), nullable=False, default='staff')  # admin, manager, staff
     branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'))
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped when the user's role or branch assignments change; stale tokens stop being trusted
+    scope_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -47,10 +168,10 @@ class User(db.Model):
     reviews_responded = db.relationship('Review', backref='responder', foreign_keys='Review.responded_by')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -71,15 +192,40 @@ class Branch(db.Model):
     name = db.Column(db.String(120), nullable=False)
     location = db.Column(db.String(255), nullable=False)
     branch_code = db.Column(db.String(50), unique=True, nullable=False)
-    manager_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    manager_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     manager = db.relationship('User', foreign_keys=[manager_id])
+    # Bumped whenever the branch's reviews or rollups change; used for ETags
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # All-time review counters (BRANCH_COUNTERS), updated in the transaction
+    # that changes the reviews; see add_branch_counts
+    total_reviews = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    positive_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    neutral_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    negative_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    responded_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    escalated_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     reviews = db.relationship('Review', backref='branch', cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def stats(self):
+        total = self.total_reviews
         return {
+            'total_reviews': total,
+            'avg_rating': round(self.rating_sum / total, 2) if total else 0,
+            'response_rate': round(self.responded_count / total * 100, 2) if total else 0,
+            'escalated_count': self.escalated_count,
+            'sentiments': {
+                'positive': self.positive_count,
+                'neutral': self.neutral_count,
+                'negative': self.negative_count
+            }
+        }
+    
+    def to_dict(self, with_stats=False):
+        data = {
             'id': self.id,
             'name': self.name,
             'location': self.location,
@@ -87,10 +233,30 @@ class Branch(db.Model):
             'manager_id': self.manager_id,
             'created_at': self.created_at.isoformat()
         }
+        if with_stats:
+            data['stats'] = self.stats()
+        return data
 
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    # Composite indexes matching the list filters (newest first), the
+    # keyset cursor and the created_at range scans used by analytics
+    __table_args__ = (
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reviews_branch_created', 'branch_id', 'created_at', 'id'),
+        db.Index('ix_reviews_branch_sentiment_created', 'branch_id', 'sentiment', 'created_at'),
+        db.Index('ix_reviews_branch_category_created', 'branch_id', 'category', 'created_at'),
+        db.Index('ix_reviews_branch_source_created', 'branch_id', 'source', 'created_at'),
+        db.Index('ix_reviews_sentiment_created', 'sentiment', 'created_at'),
+        # Covering, partial indexes for the staff performance aggregates
+        db.Index('ix_reviews_branch_created_staff', 'branch_id', 'created_at', 'staff_id', 'rating',
+                 sqlite_where=db.text('staff_id IS NOT NULL'),
+                 postgresql_where=db.text('staff_id IS NOT NULL')),
+        db.Index('ix_reviews_branch_responded', 'branch_id', 'responded_at', 'responded_by', 'created_at',
+                 sqlite_where=db.text('responded_by IS NOT NULL'),
+                 postgresql_where=db.text('responded_by IS NOT NULL')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'), nullable=False)
@@ -114,30 +280,8 @@ class Review(db.Model):
     
     staff = db.relationship('User', foreign_keys=[staff_id], backref='reviews_tagged')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'branch_id': self.branch_id,
-            'branch_name': self.branch.name if self.branch else None,
-            'rating': self.rating,
-            'title': self.title,
-            'content': self.content,
-            'source': self.source,
-            'category': self.category,
-            'sentiment': self.sentiment,
-            'customer_name': self.customer_name,
-            'customer_email': self.customer_email,
-            'customer_phone': self.customer_phone,
-            'staff_id': self.staff_id,
-            'staff_name': self.staff.full_name if self.staff else None,
-            'is_responded': self.is_responded,
-            'response_text': self.response_text,
-            'responded_by': self.responded_by,
-            'responded_at': self.responded_at.isoformat() if self.responded_at else None,
-            'is_escalated': self.is_escalated,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    def to_dict(self, fields=None):
+        return serialize_review(self, fields or REVIEW_FIELDS)
 
 
 class ReplyTemplate(db.Model):
@@ -151,6 +295,7 @@ class ReplyTemplate(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     creator = db.relationship('User')
     
@@ -168,6 +313,9 @@ class ReplyTemplate(db.Model):
 
 class Analytics(db.Model):
     __tablename__ = 'analytics'
+    __table_args__ = (
+        db.UniqueConstraint('branch_id', 'date', name='uq_analytics_branch_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'), nullable=False)
@@ -178,6 +326,10 @@ class Analytics(db.Model):
     neutral_count = db.Column(db.Integer, default=0)
     negative_count = db.Column(db.Integer, default=0)
     response_rate = db.Column(db.Float, default=0.0)
+    # Raw counters that per-event deltas are added to; avg_rating and
+    # response_rate are derived from them on every upsert
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    responded_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     branch = db.relationship('Branch')
@@ -196,8 +348,630 @@ class Analytics(db.Model):
         }
 
 
+class AnalyticsBreakdown(db.Model):
+    """Daily rollup per branch split by one review dimension (source or category)"""
+    __tablename__ = 'analytics_breakdowns'
+    __table_args__ = (
+        db.UniqueConstraint('branch_id', 'date', 'dimension', 'value', name='uq_analytics_breakdown'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    branch_id = db.Column(db.Integer, db.ForeignKey('branches.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    dimension = db.Column(db.String(20), nullable=False)  # source, category
+    value = db.Column(db.String(100), nullable=False)
+    total_reviews = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    responded_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class StreamEvent(db.Model):
+    """Committed review event waiting to be relayed to other workers' streams, see events.py"""
+    __tablename__ = 'stream_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    branch_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class Job(db.Model):
+    """Queued background work, see jobs.py"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    coalesce_key = db.Column(db.String(120))
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ============ FULL-TEXT SEARCH ============
+# SQLite keeps an external-content FTS5 index of reviews.title/content in
+# sync with triggers; PostgreSQL uses a generated tsvector column with a
+# GIN index. Migration 0006 creates the same objects on existing databases.
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    "title, content, content='reviews', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN "
+    "INSERT INTO reviews_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF title, content ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO reviews_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+)
+POSTGRES_FTS_DDL = (
+    "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_vector ON reviews USING GIN (search_vector)",
+)
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Review.__table__, 'after_create', db.DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_FTS_DDL:
+    event.listen(Review.__table__, 'after_create', db.DDL(_statement).execute_if(dialect='postgresql'))
+event.listen(Review.__table__, 'before_drop', db.DDL('DROP TABLE IF EXISTS reviews_fts').execute_if(dialect='sqlite'))
+
+SEARCH_TERM_RE = re.compile(r'(\w+)(\*?)', re.UNICODE)
+# Control characters mark highlights inside the database snippet so the
+# surrounding review text can be HTML-escaped before <mark> tags go in
+_HIGHLIGHT_START, _HIGHLIGHT_END = '\x02', '\x03'
+
+
+def parse_search_terms(q):
+    """(term, is_prefix) pairs from a user query; 'serv*' is a prefix term"""
+    return [(term.lower(), bool(star)) for term, star in SEARCH_TERM_RE.findall(q or '')][:16]
+
+
+def _highlight(snippet):
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_HIGHLIGHT_START, '<mark>').replace(_HIGHLIGHT_END, '</mark>')
+
+
+def search_review_ids(terms, branch_ids=None, branch_id=None, limit=10, offset=0):
+    """Ranked (review_id, rank, highlighted snippet) matches for all terms, best first"""
+    dialect = db.session.get_bind().dialect.name
+    params = {'limit': limit, 'offset': offset, 'start': _HIGHLIGHT_START, 'end': _HIGHLIGHT_END}
+    scope = ''
+    if branch_ids is not None:
+        scope += ' AND reviews.branch_id IN :branch_ids'
+        params['branch_ids'] = list(branch_ids) or [-1]
+    if branch_id:
+        scope += ' AND reviews.branch_id = :branch_id'
+        params['branch_id'] = branch_id
+
+    if dialect == 'sqlite':
+        params['match'] = ' '.join(f'"{term}"' + ('*' if prefix else '') for term, prefix in terms)
+        sql = (
+            "SELECT reviews.id, -bm25(reviews_fts, 2.0, 1.0) AS rank, "
+            "snippet(reviews_fts, 1, :start, :end, '…', 16) AS snippet "
+            "FROM reviews_fts JOIN reviews ON reviews.id = reviews_fts.rowid "
+            f"WHERE reviews_fts MATCH :match{scope} "
+            "ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+        )
+    elif dialect == 'postgresql':
+        params['tsquery'] = ' & '.join(term + (':*' if prefix else '') for term, prefix in terms)
+        params['headline'] = f'StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_END}, MaxWords=24, MinWords=8'
+        # Headlines are expensive, so only the page of hits gets one
+        sql = (
+            "SELECT hits.id, hits.rank, ts_headline('english', reviews.content, hits.query, :headline) AS snippet "
+            "FROM (SELECT reviews.id, ts_rank_cd(reviews.search_vector, query) AS rank, query "
+            "FROM reviews, to_tsquery('english', :tsquery) AS query "
+            f"WHERE reviews.search_vector @@ query{scope} "
+            "ORDER BY rank DESC LIMIT :limit OFFSET :offset) AS hits "
+            "JOIN reviews ON reviews.id = hits.id ORDER BY hits.rank DESC"
+        )
+    else:
+        raise NotImplementedError(f'Full-text search is not available on {dialect}')
+
+    stmt = db.text(sql)
+    if 'branch_ids' in params:
+        stmt = stmt.bindparams(db.bindparam('branch_ids', expanding=True))
+    rows = db.session.execute(stmt, params).all()
+    return [(row.id, float(row.rank), _highlight(row.snippet)) for row in rows]
+
+
+# ============ CACHE INVALIDATION ============
+
+def branch_cache_scopes(branch_ids):
+    """Cache scopes an analytics response over branch_ids depends on"""
+    # An empty list means the response covers every review
+    return [f'branch:{b}' for b in branch_ids] if branch_ids else ['all']
+
+
+def mark_branches_changed(branch_ids):
+    """Invalidate cached analytics for these branches once the current transaction commits"""
+    db.session.info.setdefault('changed_branches', set()).update(branch_ids)
+
+
+def add_branch_counts(changes):
+    """Add (review, delta) pairs to the branches' BRANCH_COUNTERS when the current transaction commits"""
+    counts = db.session.info.setdefault('branch_counts', {})
+    for review, delta in changes:
+        counts.setdefault(review.branch_id, Counter()).update(delta)
+    mark_branches_changed(counts)
+
+
+def mark_templates_changed():
+    """Rebuild this worker's template suggestion index once the current transaction commits"""
+    db.session.info['templates_changed'] = True
+
+
+def revoke_access_scope(user_ids):
+    """Stop trusting the scope claims in tokens already issued to these users"""
+    db.session.info.setdefault('revoked_users', set()).update(user_ids)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _bump_branch_versions(session):
+    branch_ids = session.info.get('changed_branches')
+    counts = session.info.get('branch_counts')
+    if counts:
+        # Counted branches get their version bump in the same statement
+        table = Branch.__table__
+        session.execute(
+            table.update()
+            .where(table.c.id == db.bindparam('b_id'))
+            .values(
+                version=table.c.version + 1,
+                updated_at=table.c.updated_at,
+                **{name: table.c[name] + db.bindparam(f'd_{name}') for name in BRANCH_COUNTERS}
+            ),
+            [
+                dict({f'd_{name}': counts[branch_id][name] for name in BRANCH_COUNTERS}, b_id=branch_id)
+                for branch_id in sorted(counts)
+            ]
+        )
+        branch_ids = branch_ids - counts.keys()
+    if branch_ids:
+        # Keep updated_at as is; it tracks edits to the branch itself
+        session.execute(
+            db.update(Branch)
+            .where(Branch.id.in_(sorted(branch_ids)))
+            .values(version=Branch.version + 1, updated_at=Branch.updated_at)
+        )
+    user_ids = session.info.get('revoked_users')
+    if user_ids:
+        session.execute(
+            db.update(User)
+            .where(User.id.in_(sorted(user_ids)))
+            .values(scope_version=User.scope_version + 1, updated_at=User.updated_at)
+        )
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_branches(session):
+    session.info.pop('branch_counts', None)
+    branch_ids = session.info.pop('changed_branches', None)
+    if branch_ids:
+        analytics_cache.invalidate(branch_cache_scopes(branch_ids) + ['all'])
+    for user_id in session.info.pop('revoked_users', ()):
+        access_scope_cache.delete(('version', user_id))
+        access_scope_cache.delete(('scope', user_id))
+    if session.info.pop('templates_changed', False):
+        template_index.invalidate()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changed_branches(session):
+    session.info.pop('changed_branches', None)
+    session.info.pop('branch_counts', None)
+    session.info.pop('revoked_users', None)
+    session.info.pop('templates_changed', None)
+
+
+# ============ ACCESS SCOPE ============
+
+class AccessScope(namedtuple('AccessScope', 'user_id role branch_ids')):
+    """The caller and the branches they may see; branch_ids is None for every branch"""
+
+    @property
+    def is_admin(self):
+        return self.role in ('admin', 'owner')
+
+    def allows(self, branch_id):
+        return self.branch_ids is None or branch_id in self.branch_ids
+
+
+def load_access_scope(user):
+    if user.role in ('admin', 'owner'):
+        branch_ids = None
+    elif user.role == 'manager':
+        # Managers see the branches they manage
+        branch_ids = tuple(b[0] for b in db.session.query(Branch.id).filter_by(manager_id=user.id).order_by(Branch.id))
+    else:
+        # Staff and other roles: prefer their assigned branch, otherwise fall back to all
+        branch_ids = (user.branch_id,) if user.branch_id else None
+    return AccessScope(user.id, user.role, branch_ids)
+
+
+def scope_claims(user):
+    """Additional JWT claims that let requests skip the user and branch lookups"""
+    scope = load_access_scope(user)
+    return {
+        'role': scope.role,
+        'branches': list(scope.branch_ids) if scope.branch_ids is not None else None,
+        'sv': user.scope_version or 0
+    }
+
+
+def _current_scope_version(user_id):
+    return access_scope_cache.get_or_set(
+        ('version', user_id),
+        lambda: db.session.scalar(db.select(User.scope_version).where(User.id == user_id))
+    )
+
+
+def current_scope():
+    """Resolve the caller's AccessScope, from the token claims when they are still current"""
+    user_id = int(get_jwt_identity())
+    claims = get_jwt()
+    if 'sv' in claims and claims['sv'] == _current_scope_version(user_id):
+        branches = claims['branches']
+        return AccessScope(user_id, claims['role'], tuple(branches) if branches is not None else None)
+    
+    # Tokens issued before a revocation (or before scope claims existed)
+    g.scope_refresh = True
+    return access_scope_cache.get_or_set(('scope', user_id), lambda: load_access_scope(User.query.get(user_id)))
+
+
+@app.after_request
+def _advertise_scope_refresh(response):
+    if g.get('scope_refresh'):
+        response.headers['X-Scope-Refresh'] = '1'
+    return response
+
+
+# ============ CONDITIONAL REQUESTS ============
+
+def branch_versions(branch_ids=None):
+    """[(id, version)] for branch_ids, or for every branch when branch_ids is None"""
+    stmt = db.select(Branch.id, Branch.version).order_by(Branch.id)
+    if branch_ids is not None:
+        stmt = stmt.where(Branch.id.in_(branch_ids))
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
+def make_etag(*parts):
+    """Strong ETag over the version markers a response is derived from"""
+    raw = json.dumps([request.path, sorted(request.args.items(multi=True)), parts], default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Let clients keep the body but revalidate it on every use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the client's validators still match, otherwise None"""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(app.response_class(status=304), etag, last_modified)
+
+
+# ============ READ REPLICA ============
+
+def read_from_replica(branch_ids=None):
+    """Send the rest of this request's reads to the replica if it is fresh enough for branch_ids.
+
+    Returns the branch versions of whichever database the response will be
+    read from, so ETags describe the data actually served.
+    """
+    primary = branch_versions(branch_ids)
+    if 'replica' not in app.config['SQLALCHEMY_BINDS']:
+        return primary
+    
+    session = db.session()
+    session.info['read_bind'] = 'replica'
+    try:
+        replica = branch_versions(branch_ids)
+    except SQLAlchemyError as e:
+        app.logger.warning('Read replica unavailable, reading from the primary: %s', e)
+        session.info.pop('read_bind', None)
+        db.session.rollback()
+        g.read_source = 'primary'
+        return primary
+    
+    key = tuple(branch_ids) if branch_ids is not None else None
+    if replica == primary:
+        replica_lag_cache.delete(key)
+        g.read_source = 'replica'
+        return replica
+    behind_since = replica_lag_cache.get_or_set(key, perf_counter)
+    if perf_counter() - behind_since <= app.config['REPLICA_MAX_LAG']:
+        g.read_source = 'replica'
+        return replica
+    session.info.pop('read_bind', None)
+    g.read_source = 'primary'
+    return primary
+
+
+@app.after_request
+def _advertise_read_source(response):
+    if g.get('read_source'):
+        response.headers['X-Read-Source'] = g.read_source
+    return response
+
+
+# ============ INSTRUMENTATION ============
+# Every SQL statement is timed at the cursor and attributed to the request
+# that issued it; totals per route are scraped from /api/metrics.
+
+metrics_registry = Registry()
+http_requests = metrics_registry.counter(
+    'http_requests_total', 'Requests handled', ('method', 'route', 'status')
+)
+http_request_duration = metrics_registry.histogram(
+    'http_request_duration_seconds', 'Time from request start to response', ('method', 'route')
+)
+db_request_duration = metrics_registry.histogram(
+    'db_request_duration_seconds', 'Time spent in SQL per request', ('method', 'route')
+)
+db_request_queries = metrics_registry.histogram(
+    'db_queries_per_request', 'SQL statements issued per request', ('method', 'route'),
+    buckets=QUERY_COUNT_BUCKETS
+)
+db_slow_queries = metrics_registry.counter(
+    'db_slow_queries_total', 'Statements slower than SLOW_QUERY_MS', ('route',)
+)
+
+
+def request_route():
+    """Route template for metric labels, so /api/reviews/1 and /api/reviews/2 share a series"""
+    return request.url_rule.rule if request.url_rule else '<unmatched>'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info['query_started'].pop()
+    route = None
+    if has_request_context():
+        g.sql_queries = g.get('sql_queries', 0) + 1
+        g.sql_time = g.get('sql_time', 0.0) + elapsed
+        route = request_route()
+    if elapsed * 1000 >= app.config['SLOW_QUERY_MS']:
+        db_slow_queries.inc(route or '<background>')
+        # Parameters are left out; they carry customer details
+        app.logger.warning('Slow query (%.1f ms) on %s: %s', elapsed * 1000, route or '<background>', statement)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _drop_query_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so the stack does not grow on a pooled connection
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = perf_counter()
+    g.sql_queries = 0
+    g.sql_time = 0.0
+
+
+@app.after_request
+def _record_request(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = perf_counter() - started
+    method, route = request.method, request_route()
+    queries, sql_time = g.get('sql_queries', 0), g.get('sql_time', 0.0)
+    
+    http_requests.inc(method, route, str(response.status_code))
+    http_request_duration.observe(elapsed, method, route)
+    db_request_duration.observe(sql_time, method, route)
+    db_request_queries.observe(queries, method, route)
+    
+    # Streamed bodies (exports) are produced after this point and are not included
+    response.headers['Server-Timing'] = (
+        f'db;dur={sql_time * 1000:.1f};desc="{queries} queries", total;dur={elapsed * 1000:.1f}'
+    )
+    return response
+
+
+# ============ BACKGROUND JOBS ============
+
+if app.config['JOB_BACKEND'] == 'inline':
+    _job_backend = InlineJobBackend()
+else:
+    _job_backend = DatabaseJobBackend(db, Job)
+job_queue = JobQueue(_job_backend, max_attempts=app.config['JOB_MAX_ATTEMPTS'])
+
+
+@job_queue.handler('analytics.rollup')
+def apply_rollup_jobs(payloads):
+    """Apply queued rollup deltas; all payloads for a branch arrive in one call"""
+    changes = []
+    for payload in payloads:
+        for date, source, category, delta in payload['rows']:
+            review = SimpleNamespace(
+                branch_id=payload['branch_id'],
+                created_at=datetime.fromisoformat(date),
+                source=source,
+                category=category
+            )
+            changes.append((review, delta))
+    apply_review_deltas(changes)
+
+
+def enqueue_review_deltas(changes):
+    """Queue rollup deltas for (review, delta) pairs as one job per touched branch.
+
+    The same deltas are added to the branch counters in this transaction.
+    """
+    changes = list(changes)
+    add_branch_counts(changes)
+    rows_by_branch = {}
+    for review, delta in changes:
+        rows_by_branch.setdefault(review.branch_id, []).append(
+            [review.created_at.date().isoformat(), review.source, review.category, delta]
+        )
+    mark_branches_changed(rows_by_branch)
+    for branch_id, rows in rows_by_branch.items():
+        job_queue.enqueue(
+            'analytics.rollup',
+            {'branch_id': branch_id, 'rows': rows},
+            coalesce_key=f'branch:{branch_id}'
+        )
+
+
+# ============ LIVE EVENTS ============
+
+if app.config['EVENTS_BACKEND'] == 'local':
+    _event_backend = LocalEventBackend()
+else:
+    _event_backend = DatabaseEventBackend(
+        db, StreamEvent,
+        poll_interval=app.config['EVENTS_POLL_INTERVAL'],
+        retention=app.config['EVENTS_RETENTION']
+    )
+    # Prune from the worker, which runs whether or not any stream is open
+    job_queue.every(max(app.config['EVENTS_RETENTION'] / 10, 1), _event_backend.prune)
+event_bus = EventBus(
+    _event_backend,
+    max_subscribers=app.config['EVENTS_MAX_SUBSCRIBERS'],
+    max_pending=app.config['EVENTS_MAX_PENDING']
+)
+
+
+def publish_event(kind, branch_id, data):
+    """Send an event to the streams that can see branch_id once the current transaction commits"""
+    db.session.info.setdefault('stream_events', []).append({'type': kind, 'branch_id': branch_id, 'data': data})
+
+
+@event.listens_for(db.session, 'before_commit')
+def _store_stream_events(session):
+    if event_bus.backend.transactional:
+        event_bus.publish(session.info.pop('stream_events', None))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _send_stream_events(session):
+    event_bus.publish(session.info.pop('stream_events', None))
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_stream_events(session):
+    session.info.pop('stream_events', None)
+
+
+def format_sse(kind, data, event_id=None):
+    """One Server-Sent Events frame"""
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {kind}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+# ============ SERIALIZERS ============
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# Field name -> (columns it reads, getter). Relationship fields list the
+# foreign key they are joined through.
+REVIEW_SERIALIZERS = {
+    'id': (('id',), lambda r: r.id),
+    'branch_id': (('branch_id',), lambda r: r.branch_id),
+    'branch_name': (('branch_id',), lambda r: r.branch.name if r.branch else None),
+    'rating': (('rating',), lambda r: r.rating),
+    'title': (('title',), lambda r: r.title),
+    'content': (('content',), lambda r: r.content),
+    'source': (('source',), lambda r: r.source),
+    'category': (('category',), lambda r: r.category),
+    'sentiment': (('sentiment',), lambda r: r.sentiment),
+    'customer_name': (('customer_name',), lambda r: r.customer_name),
+    'customer_email': (('customer_email',), lambda r: r.customer_email),
+    'customer_phone': (('customer_phone',), lambda r: r.customer_phone),
+    'staff_id': (('staff_id',), lambda r: r.staff_id),
+    'staff_name': (('staff_id',), lambda r: r.staff.full_name if r.staff else None),
+    'is_responded': (('is_responded',), lambda r: r.is_responded),
+    'response_text': (('response_text',), lambda r: r.response_text),
+    'responded_by': (('responded_by',), lambda r: r.responded_by),
+    'responded_at': (('responded_at',), lambda r: _isoformat(r.responded_at)),
+    'is_escalated': (('is_escalated',), lambda r: r.is_escalated),
+    'created_at': (('created_at',), lambda r: _isoformat(r.created_at)),
+    'updated_at': (('updated_at',), lambda r: _isoformat(r.updated_at))
+}
+REVIEW_FIELDS = tuple(REVIEW_SERIALIZERS)
+# Contact details are only needed on the detail view
+REVIEW_LIST_FIELDS = tuple(f for f in REVIEW_FIELDS if f not in ('customer_email', 'customer_phone'))
+
+
+def serialize_review(review, fields=REVIEW_FIELDS):
+    return {field: REVIEW_SERIALIZERS[field][1](review) for field in fields}
+
+
+def requested_review_fields(default=REVIEW_FIELDS):
+    """Fields selected with ?fields=a,b,c, or default; raises ValueError on unknown names"""
+    raw = request.args.get('fields')
+    if not raw:
+        return default
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in REVIEW_SERIALIZERS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields or default
+
+
+def requested_review_filters():
+    """Equality filters for review lists taken from the query string"""
+    filters = {
+        'branch_id': request.args.get('branch_id', type=int),
+        'sentiment': request.args.get('sentiment'),
+        'category': request.args.get('category'),
+        'source': request.args.get('source')
+    }
+    return {name: value for name, value in filters.items() if value}
+
+
+def review_load_options(fields):
+    """Loader options that fetch exactly what serialize_review needs for fields in one query"""
+    columns = {'created_at'} | {c for f in fields for c in REVIEW_SERIALIZERS[f][0]}
+    options = [load_only(*(getattr(Review, c) for c in sorted(columns)))]
+    if 'branch_name' in fields:
+        options.append(joinedload(Review.branch).load_only(Branch.name))
+    if 'staff_name' in fields:
+        options.append(joinedload(Review.staff).load_only(User.full_name))
+    return options
+
+
 # ============ AUTHENTICATION ROUTES ============
 
+def hasher_busy_response(error):
+    response = jsonify({'message': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+
 @app.route('/api/auth/register', methods=['POST'])
 def register():
     try:
@@ -224,12 +998,15 @@ def register():
         db.session.add(user)
         db.session.commit()
         
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_access_token(identity=str(user.id), additional_claims=scope_claims(user))
         return jsonify({
             'message': 'User registered successfully',
             'access_token': access_token,
             'user': user.to_dict()
         }), 201
+    except HasherBusy as e:
+        db.session.rollback()
+        return hasher_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 500
@@ -251,12 +1028,37 @@ def login():
         if not user.is_active:
             return jsonify({'message': 'User account is inactive'}), 403
         
-        access_token = create_access_token(identity=str(user.id))
+        # Upgrade hashes made with old parameters while the plaintext is at hand
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+            except HasherBusy:
+                pass
+        
+        access_token = create_access_token(identity=str(user.id), additional_claims=scope_claims(user))
         
         return jsonify({
             'access_token': access_token,
             'user': user.to_dict()
         }), 200
+    except HasherBusy as e:
+        return hasher_busy_response(e)
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/auth/refresh', methods=['POST'])
+@jwt_required()
+def refresh_token():
+    """Reissue the caller's token with current scope claims (after X-Scope-Refresh)"""
+    try:
+        user = User.query.get(int(get_jwt_identity()))
+        if not user or not user.is_active:
+            return jsonify({'message': 'User account is inactive'}), 403
+        
+        access_token = create_access_token(identity=str(user.id), additional_claims=scope_claims(user))
+        return jsonify({'access_token': access_token}), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -267,15 +1069,28 @@ def login():
 @jwt_required()
 def get_branches():
     try:
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
+        scope = current_scope()
+        with_stats = request.args.get('with_stats', type=int) == 1
         
-        if user.role in ('admin', 'owner'):
-            branches = Branch.query.all()
-        else:
-            branches = Branch.query.filter_by(manager_id=current_user_id).all()
+        query = Branch.query
+        if not scope.is_admin:
+            query = query.filter_by(manager_id=scope.user_id)
         
-        return jsonify([branch.to_dict() for branch in branches]), 200
+        # Versions only grow, so their sum moves whenever any branch's counters do
+        count, last_modified, versions = query.with_entities(
+            db.func.count(Branch.id), db.func.max(Branch.updated_at), db.func.sum(Branch.version)
+        ).one()
+        etag = make_etag(scope.user_id, count, last_modified, versions if with_stats else None)
+        # Counter updates keep updated_at, so Last-Modified cannot validate stats
+        if with_stats:
+            last_modified = None
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
+        branches = query.all()
+        response = jsonify([branch.to_dict(with_stats=with_stats) for branch in branches])
+        return with_validators(response, etag, last_modified), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -283,8 +1098,15 @@ def get_branches():
 @app.route('/api/public/branches', methods=['GET'])
 def get_public_branches():
     try:
+        count, last_modified = db.session.query(db.func.count(Branch.id), db.func.max(Branch.updated_at)).one()
+        etag = make_etag(count, last_modified)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         branches = Branch.query.all()
-        return jsonify([{'id': b.id, 'name': b.name, 'location': b.location} for b in branches]), 200
+        response = jsonify([{'id': b.id, 'name': b.name, 'location': b.location} for b in branches])
+        return with_validators(response, etag, last_modified), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -293,10 +1115,7 @@ def get_public_branches():
 @jwt_required()
 def create_branch():
     try:
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
-        
-        if user.role not in ('admin', 'owner'):
+        if not current_scope().is_admin:
             return jsonify({'message': 'Unauthorized'}), 403
         
         data = request.get_json()
@@ -312,6 +1131,10 @@ def create_branch():
         )
         
         db.session.add(branch)
+        db.session.flush()
+        mark_branches_changed([branch.id])
+        if branch.manager_id:
+            revoke_access_scope([branch.manager_id])
         db.session.commit()
         
         return jsonify({
@@ -329,54 +1152,70 @@ def create_branch():
 @jwt_required()
 def get_reviews():
     try:
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
+        scope = current_scope()
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        branch_id = request.args.get('branch_id', type=int)
-        sentiment = request.args.get('sentiment')
-        category = request.args.get('category')
-        source = request.args.get('source')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+        filters = requested_review_filters()
+        cursor = request.args.get('cursor')
+        with_total = request.args.get('with_total', 0, type=int)
+        try:
+            fields = requested_review_fields(REVIEW_LIST_FIELDS)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
         query = Review.query
-
-        # Access control: which branches this user can see
-        if user.role in ('admin', 'owner'):
-            # Admins can see all reviews
-            pass
-        elif user.role == 'manager':
-            # Managers see reviews for branches they manage
-            manager_branch_ids = db.session.query(Branch.id).filter_by(manager_id=current_user_id).all()
-            manager_branch_ids = [b[0] for b in manager_branch_ids]
-            if manager_branch_ids:
-                query = query.filter(Review.branch_id.in_(manager_branch_ids))
-            else:
-                query = query.filter(False)
+        if scope.branch_ids is not None:
+            query = query.filter(Review.branch_id.in_(scope.branch_ids))
+        
+        # Answer repeated polls from the branch versions alone
+        etag = make_etag(read_from_replica(scope.branch_ids))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        query = query.filter_by(**filters)
+        ordered = query.options(*review_load_options(fields)).order_by(Review.created_at.desc(), Review.id.desc())
+        
+        # Cursor mode: seek past the last (created_at, id) seen instead of OFFSET
+        if cursor is not None:
+            if cursor:
+                try:
+                    created_at, last_id = decode_review_cursor(cursor)
+                except ValueError:
+                    return jsonify({'message': 'Invalid cursor'}), 400
+                ordered = ordered.filter(
+                    Review.created_at <= created_at,
+                    db.or_(Review.created_at < created_at, Review.id < last_id)
+                )
+            reviews = ordered.limit(per_page + 1).all()
+            has_more = len(reviews) > per_page
+            reviews = reviews[:per_page]
+            
+            result = {
+                'reviews': [serialize_review(review, fields) for review in reviews],
+                'next_cursor': encode_review_cursor(reviews[-1]) if has_more else None
+            }
+            if with_total:
+                result['total'] = query.order_by(None).count()
+            return with_validators(jsonify(result), etag), 200
+        
+        reviews = ordered.limit(per_page).offset((page - 1) * per_page).all()
+        
+        # The exact COUNT(*) is opt-in; otherwise reuse a recent one for this scope and filter set
+        if with_total:
+            total = query.order_by(None).count()
         else:
-            # Staff and other roles: prefer their assigned branch, otherwise fall back to all
-            if user.branch_id:
-                query = query.filter_by(branch_id=user.branch_id)
-        
-        if branch_id:
-            query = query.filter_by(branch_id=branch_id)
-        if sentiment:
-            query = query.filter_by(sentiment=sentiment)
-        if category:
-            query = query.filter_by(category=category)
-        if source:
-            query = query.filter_by(source=source)
-        
-        reviews = query.order_by(Review.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+            count_key = (scope.branch_ids, tuple(sorted(filters.items())))
+            total = review_count_cache.get_or_set(count_key, lambda: query.order_by(None).count())
         
-        return jsonify({
-            'reviews': [review.to_dict() for review in reviews.items],
-            'total': reviews.total,
-            'pages': reviews.pages,
-            'current_page': page
-        }), 200
+        return with_validators(jsonify({
+            'reviews': [serialize_review(review, fields) for review in reviews],
+            'total': total,
+            'pages': math.ceil(total / per_page),
+            'current_page': page,
+            'next_cursor': encode_review_cursor(reviews[-1]) if len(reviews) == per_page else None
+        }), etag), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -399,30 +1238,172 @@ def create_review():
             staff_id=data.get('staff_id')
         )
         
-        # Sentiment analysis (simple rule-based)
-        review.sentiment = analyze_sentiment(data['rating'], data['content'])
+        # Sentiment analysis (lexicon-based, see sentiment.py)
+        review.sentiment = analyze_sentiment(data['rating'], data['content'], data.get('category'))
         
         db.session.add(review)
-        db.session.commit()
+        db.session.flush()
         
-        # Update analytics
-        update_analytics(data['branch_id'])
+        # Rollups are updated by the worker; the job row commits with the review
+        enqueue_review_deltas([(review, review_analytics_delta(review))])
+        # Serialize once before commit: the event reuses it and the expired
+        # instance is not reloaded for the response
+        result = serialize_review(review)
+        publish_event('review.created', review.branch_id, {'review': {f: result[f] for f in REVIEW_LIST_FIELDS}})
+        db.session.commit()
         
         return jsonify({
             'message': 'Review created successfully',
-            'review': review.to_dict()
+            'review': result
         }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 500
 
 
+@app.route('/api/reviews/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_reviews():
+    try:
+        scope = current_scope()
+        
+        # Imports may only target branches the caller administers
+        if scope.is_admin:
+            allowed_branch_ids = {b[0] for b in db.session.query(Branch.id).all()}
+        elif scope.role == 'manager':
+            allowed_branch_ids = set(scope.branch_ids)
+        else:
+            return jsonify({'message': 'Unauthorized'}), 403
+        known_staff_ids = {u[0] for u in db.session.query(User.id).all()}
+        
+        if request.mimetype in NDJSON_MIMETYPES:
+            rows = _ndjson_rows(request.stream)
+        else:
+            rows = request.get_json(silent=True)
+            if not isinstance(rows, list):
+                return jsonify({'message': 'Expected a JSON array or an NDJSON body'}), 400
+        
+        chunk_size = app.config['BULK_INSERT_CHUNK_SIZE']
+        received = 0
+        inserted = 0
+        errors = []
+        chunk = []
+        for index, raw in enumerate(rows):
+            received += 1
+            try:
+                chunk.append((index, validate_bulk_review(raw, allowed_branch_ids, known_staff_ids)))
+            except ValueError as e:
+                errors.append({'index': index, 'message': str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                inserted += _insert_review_chunk(chunk, errors)
+                chunk = []
+        if chunk:
+            inserted += _insert_review_chunk(chunk, errors)
+        
+        return jsonify({
+            'message': 'Bulk import finished',
+            'received': received,
+            'inserted': inserted,
+            'failed': len(errors),
+            'errors': sorted(errors, key=lambda e: e['index'])
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/reviews/search', methods=['GET'])
+@jwt_required()
+def search_reviews():
+    try:
+        scope = current_scope()
+        
+        terms = parse_search_terms(request.args.get('q'))
+        if not terms:
+            return jsonify({'message': 'Missing search query'}), 400
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+        branch_id = request.args.get('branch_id', type=int)
+        try:
+            fields = requested_review_fields(REVIEW_LIST_FIELDS)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        hits = search_review_ids(terms, scope.branch_ids, branch_id, limit=per_page, offset=(page - 1) * per_page)
+        reviews = {
+            review.id: review
+            for review in Review.query.options(*review_load_options(fields)).filter(
+                Review.id.in_([hit[0] for hit in hits])
+            )
+        } if hits else {}
+        
+        results = []
+        for review_id, rank, snippet in hits:
+            if review_id in reviews:
+                item = serialize_review(reviews[review_id], fields)
+                item['rank'] = rank
+                item['highlight'] = snippet
+                results.append(item)
+        
+        return jsonify({
+            'reviews': results,
+            'query': ' '.join(term + ('*' if prefix else '') for term, prefix in terms),
+            'current_page': page
+        }), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/reviews/export', methods=['GET'])
+@jwt_required()
+def export_reviews():
+    try:
+        scope = current_scope()
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({'message': 'Invalid format, expected csv or ndjson'}), 400
+        try:
+            fields = requested_review_fields()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        query = Review.query.filter_by(**requested_review_filters())
+        if scope.branch_ids is not None:
+            query = query.filter(Review.branch_id.in_(scope.branch_ids))
+        read_from_replica(scope.branch_ids)
+        
+        # Rows come off a server-side cursor in batches and are written out as they
+        # arrive, so memory does not grow with the size of the export
+        batch_size = app.config['EXPORT_BATCH_SIZE']
+        reviews = query.options(*review_load_options(fields)).order_by(Review.id).yield_per(batch_size)
+        body = export_review_chunks(reviews, fields, export_format, batch_size)
+        
+        filename = f"reviews-{datetime.utcnow():%Y%m%d}.{export_format}"
+        headers = {'Content-Disposition': f'attachment; filename="{filename}"', 'Vary': 'Accept-Encoding'}
+        if 'gzip' in request.accept_encodings:
+            body = gzip_chunks(body)
+            headers['Content-Encoding'] = 'gzip'
+        
+        return app.response_class(
+            stream_with_context(body),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers=headers
+        ), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
 @app.route('/api/reviews/<int:review_id>', methods=['GET'])
 @jwt_required()
 def get_review(review_id):
     try:
-        review = Review.query.get_or_404(review_id)
-        return jsonify(review.to_dict()), 200
+        fields = requested_review_fields()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        review = Review.query.options(*review_load_options(fields)).filter_by(id=review_id).first_or_404()
+        return jsonify(serialize_review(review, fields)), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -430,24 +1411,36 @@ def get_review(review_id):
 @app.route('/api/reviews/<int:review_id>/respond', methods=['POST'])
 @jwt_required()
 def respond_to_review(review_id):
+    try:
+        fields = requested_review_fields()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     try:
         current_user_id = int(get_jwt_identity())
         data = request.get_json()
         
-        review = Review.query.get_or_404(review_id)
+        review = Review.query.options(*review_load_options(REVIEW_FIELDS)).filter_by(id=review_id).first_or_404()
+        first_response = not review.is_responded
         review.response_text = data['response_text']
         review.is_responded = True
         review.responded_by = current_user_id
         review.responded_at = datetime.utcnow()
         
-        db.session.commit()
+        # Count the response against the day the review was created
+        if first_response:
+            enqueue_review_deltas([(review, {'responded_count': 1})])
+        else:
+            mark_branches_changed([review.branch_id])
         
-        # Update analytics
-        update_analytics(review.branch_id)
+        # Serialize before commit so the expired instance is not reloaded
+        db.session.flush()
+        result = serialize_review(review, fields)
+        publish_event('review.responded', review.branch_id, {'review': serialize_review(review, REVIEW_LIST_FIELDS)})
+        db.session.commit()
         
         return jsonify({
             'message': 'Response added successfully',
-            'review': review.to_dict()
+            'review': result
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -458,13 +1451,136 @@ def respond_to_review(review_id):
 @jwt_required()
 def escalate_review(review_id):
     try:
-        review = Review.query.get_or_404(review_id)
+        fields = requested_review_fields()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        review = Review.query.options(*review_load_options(REVIEW_FIELDS)).filter_by(id=review_id).first_or_404()
+        if not review.is_escalated:
+            add_branch_counts([(review, {'escalated_count': 1})])
         review.is_escalated = True
+        mark_branches_changed([review.branch_id])
+        
+        db.session.flush()
+        result = serialize_review(review, fields)
+        publish_event('review.escalated', review.branch_id, {'review': serialize_review(review, REVIEW_LIST_FIELDS)})
         db.session.commit()
         
         return jsonify({
             'message': 'Review escalated successfully',
-            'review': review.to_dict()
+            'review': result
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/reviews/batch', methods=['POST'])
+@jwt_required()
+def batch_moderate_reviews():
+    """Respond to, escalate or unescalate many reviews in one transaction"""
+    try:
+        fields = requested_review_fields(REVIEW_LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        scope = current_scope()
+        data = request.get_json(silent=True) or {}
+        action = data.get('action')
+        review_ids = data.get('review_ids')
+        filters = data.get('filter')
+        limit = app.config['BATCH_MODERATION_LIMIT']
+        
+        if action not in BATCH_ACTIONS:
+            return jsonify({'message': f"action must be one of {', '.join(BATCH_ACTIONS)}"}), 400
+        if (review_ids is None) == (filters is None):
+            return jsonify({'message': 'Pass either review_ids or filter'}), 400
+        
+        response_text = template = None
+        if action == 'respond':
+            response_text = data.get('response_text')
+            template_id = data.get('template_id')
+            if bool(response_text) == bool(template_id):
+                return jsonify({'message': 'Pass either response_text or template_id'}), 400
+            if template_id:
+                template = ReplyTemplate.query.filter_by(id=template_id, is_active=True).first()
+                if template is None:
+                    return jsonify({'message': 'Template not found'}), 404
+        
+        query = Review.query.options(*review_load_options(tuple(set(fields) | set(REVIEW_LIST_FIELDS))))
+        if scope.branch_ids is not None:
+            query = query.filter(Review.branch_id.in_(scope.branch_ids))
+        has_more = False
+        if review_ids is not None:
+            if not isinstance(review_ids, list) or not all(isinstance(i, int) for i in review_ids):
+                return jsonify({'message': 'review_ids must be a list of integers'}), 400
+            review_ids = list(dict.fromkeys(review_ids))
+            if len(review_ids) > limit:
+                return jsonify({'message': f'At most {limit} reviews per batch'}), 400
+            found = {review.id: review for review in query.filter(Review.id.in_(review_ids))}
+            targets = [(review_id, found.get(review_id)) for review_id in review_ids]
+        else:
+            if not isinstance(filters, dict) or set(filters) - set(BATCH_FILTERS):
+                return jsonify({'message': f"filter keys must be among {', '.join(BATCH_FILTERS)}"}), 400
+            try:
+                validate_batch_filter(filters)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+            # Oldest first, so repeated batches work through a backlog in order
+            matched = query.filter_by(**filters).order_by(Review.created_at, Review.id).limit(limit + 1).all()
+            has_more = len(matched) > limit
+            targets = [(review.id, review) for review in matched[:limit]]
+        
+        compiled = compile_template(template.template_text) if template else None
+        now = datetime.utcnow()
+        current_user_id = int(get_jwt_identity())
+        deltas = []
+        escalations = []
+        changed = []
+        statuses = {}
+        for review_id, review in targets:
+            if review is None:
+                statuses[review_id] = 'not_found'
+            elif action == 'respond':
+                if not review.is_responded:
+                    deltas.append((review, {'responded_count': 1}))
+                review.response_text = compiled.render(reply_values(review)) if compiled else response_text
+                review.is_responded = True
+                review.responded_by = current_user_id
+                review.responded_at = now
+                changed.append(review)
+            elif bool(review.is_escalated) == (action == 'escalate'):
+                statuses[review_id] = 'unchanged'
+            else:
+                review.is_escalated = action == 'escalate'
+                escalations.append((review, {'escalated_count': 1 if action == 'escalate' else -1}))
+                changed.append(review)
+        
+        # One rollup job per branch; the worker folds it into one upsert per branch/day
+        enqueue_review_deltas(deltas)
+        add_branch_counts(escalations)
+        # Re-responses change no counter but still change what the branch serves
+        mark_branches_changed({review.branch_id for review in changed})
+        kind = {'respond': 'review.responded', 'escalate': 'review.escalated', 'unescalate': 'review.unescalated'}[action]
+        for review in changed:
+            publish_event(kind, review.branch_id, {'review': serialize_review(review, REVIEW_LIST_FIELDS)})
+        
+        db.session.flush()
+        results = []
+        for review_id, review in targets:
+            status = statuses.get(review_id, 'ok')
+            result = {'id': review_id, 'status': status}
+            if review is not None:
+                result['review'] = serialize_review(review, fields)
+            results.append(result)
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Batch applied',
+            'action': action,
+            'updated': len(changed),
+            'has_more': has_more,
+            'results': results
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -477,8 +1593,16 @@ def escalate_review(review_id):
 @jwt_required()
 def get_templates():
     try:
+        # Additions change the count and newest id, edits the newest updated_at
+        etag = make_etag(*db.session.query(
+            db.func.count(ReplyTemplate.id), db.func.max(ReplyTemplate.id), db.func.max(ReplyTemplate.updated_at)
+        ).one())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         templates = ReplyTemplate.query.filter_by(is_active=True).all()
-        return jsonify([template.to_dict() for template in templates]), 200
+        return with_validators(jsonify([template.to_dict() for template in templates]), etag), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -490,6 +1614,9 @@ def create_template():
         current_user_id = int(get_jwt_identity())
         data = request.get_json()
         
+        unknown = unknown_placeholders(data['template_text'], REPLY_PLACEHOLDERS)
+        if unknown:
+            return jsonify({'message': f"Unknown placeholders: {', '.join(unknown)}"}), 400
         template = ReplyTemplate(
             name=data['name'],
             template_text=data['template_text'],
@@ -499,6 +1626,7 @@ def create_template():
         )
         
         db.session.add(template)
+        mark_templates_changed()
         db.session.commit()
         
         return jsonify({
@@ -510,69 +1638,99 @@ def create_template():
         return jsonify({'message': str(e)}), 500
 
 
-# ============ ANALYTICS ROUTES ============
-
-@app.route('/api/analytics/dashboard', methods=['GET'])
+@app.route('/api/templates/<int:template_id>', methods=['PUT'])
 @jwt_required()
-def get_dashboard():
+def update_template(template_id):
     try:
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
+        scope = current_scope()
+        data = request.get_json(silent=True)
+        template = ReplyTemplate.query.filter_by(id=template_id).first()
+        if template is None:
+            return jsonify({'message': 'Template not found'}), 404
+        # Templates are shared and sent to customers, so only admins and their author edit them
+        if not scope.is_admin and template.created_by != scope.user_id:
+            return jsonify({'message': 'Unauthorized'}), 403
+        if not isinstance(data, dict):
+            return jsonify({'message': 'Request body must be a JSON object'}), 400
         
-        # Determine which branches this user can see
-        if user.role in ('admin', 'owner'):
-            branch_ids = [b[0] for b in db.session.query(Branch.id).all()]
-        elif user.role == 'manager':
-            branch_ids = [b[0] for b in db.session.query(Branch.id).filter_by(manager_id=current_user_id).all()]
-        else:
-            # Staff and other roles: prefer their assigned branch, otherwise show all
-            if user.branch_id:
-                branch_ids = [user.branch_id]
-            else:
-                branch_ids = [b[0] for b in db.session.query(Branch.id).all()]
-
-        reviews_query = Review.query
-        if branch_ids:
-            reviews_query = reviews_query.filter(Review.branch_id.in_(branch_ids))
-        reviews = reviews_query.all()
-        
-        total_reviews = len(reviews)
-        avg_rating = sum(r.rating for r in reviews) / len(reviews) if reviews else 0
-        responded = sum(1 for r in reviews if r.is_responded)
-        response_rate = (responded / total_reviews * 100) if total_reviews > 0 else 0
-        
-        sentiments = {
-            'positive': sum(1 for r in reviews if r.sentiment == 'positive'),
-            'neutral': sum(1 for r in reviews if r.sentiment == 'neutral'),
-            'negative': sum(1 for r in reviews if r.sentiment == 'negative')
-        }
+        for name in ('name', 'template_text'):
+            if name in data and (not isinstance(data[name], str) or not data[name].strip()):
+                return jsonify({'message': f'{name} must be a non-empty string'}), 400
+        for name in ('category', 'sentiment_type'):
+            if name in data and data[name] is not None and not isinstance(data[name], str):
+                return jsonify({'message': f'{name} must be a string'}), 400
+        if 'is_active' in data and not isinstance(data['is_active'], bool):
+            return jsonify({'message': 'is_active must be true or false'}), 400
+        if 'template_text' in data:
+            unknown = unknown_placeholders(data['template_text'], REPLY_PLACEHOLDERS)
+            if unknown:
+                return jsonify({'message': f"Unknown placeholders: {', '.join(unknown)}"}), 400
+        for name in ('name', 'template_text', 'category', 'sentiment_type', 'is_active'):
+            if name in data:
+                setattr(template, name, data[name])
         
-        # Branch-wise ratings
-        branch_ratings = {}
-        for review in reviews:
-            if review.branch_id not in branch_ratings:
-                branch_ratings[review.branch_id] = []
-            branch_ratings[review.branch_id].append(review.rating)
-        
-        branch_stats = []
-        for branch_id in branch_ids:
-            branch = Branch.query.get(branch_id)
-            ratings = branch_ratings.get(branch_id, [])
-            avg = sum(ratings) / len(ratings) if ratings else 0
-            branch_stats.append({
-                'branch_id': branch_id,
-                'branch_name': branch.name,
-                'avg_rating': round(avg, 2),
-                'total_reviews': len(ratings)
-            })
+        mark_templates_changed()
+        db.session.commit()
         
         return jsonify({
-            'total_reviews': total_reviews,
-            'avg_rating': round(avg_rating, 2),
-            'response_rate': round(response_rate, 2),
-            'sentiments': sentiments,
-            'branch_stats': branch_stats
+            'message': 'Template updated successfully',
+            'template': template.to_dict()
         }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/templates/suggest', methods=['GET'])
+@jwt_required()
+def suggest_templates():
+    """Best matching active templates for a review, rendered for it"""
+    try:
+        review_id = request.args.get('review_id', type=int)
+        limit = min(max(request.args.get('limit', 3, type=int), 1), 20)
+        if review_id is None:
+            return jsonify({'message': 'review_id is required'}), 400
+        
+        review = Review.query.options(
+            *review_load_options(('category', 'sentiment', 'customer_name', 'branch_name', 'staff_name'))
+        ).filter_by(id=review_id).first()
+        if review is None:
+            return jsonify({'message': 'Review not found'}), 404
+        if not current_scope().allows(review.branch_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        
+        values = reply_values(review)
+        suggestions = [
+            dict(template, rendered=compiled.render(values))
+            for template, compiled in template_index.suggest(review.category, review.sentiment, limit)
+        ]
+        return jsonify({'review_id': review_id, 'suggestions': suggestions}), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+# ============ ANALYTICS ROUTES ============
+
+@app.route('/api/analytics/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    try:
+        versions = read_from_replica(current_scope().branch_ids)
+        branch_ids = [b[0] for b in versions]
+
+        etag = make_etag(versions)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        # The DB versions also move on commits made by other processes (the
+        # rollup worker, other web workers), which never bump this cache
+        summary, hit = analytics_cache.get_or_compute(
+            'dashboard', branch_cache_scopes(branch_ids), {'versions': versions}, lambda: dashboard_summary(branch_ids)
+        )
+        response = with_validators(jsonify(summary), etag)
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response, 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -581,127 +1739,1108 @@ def get_dashboard():
 @jwt_required()
 def get_trends():
     try:
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
-        days = request.args.get('days', 30, type=int)
-
-        # Determine which branches this user can see
-        if user.role in ('admin', 'owner'):
-            branch_ids = [b[0] for b in db.session.query(Branch.id).all()]
-        elif user.role == 'manager':
-            branch_ids = [b[0] for b in db.session.query(Branch.id).filter_by(manager_id=current_user_id).all()]
-        else:
-            # Staff and other roles: prefer their assigned branch, otherwise show all
-            if user.branch_id:
-                branch_ids = [user.branch_id]
-            else:
-                branch_ids = [b[0] for b in db.session.query(Branch.id).all()]
+        scope = current_scope()
+        days = min(max(request.args.get('days', 30, type=int), 1), MAX_ANALYTICS_DAYS)
+        granularity = request.args.get('granularity', 'day')
+        breakdown = request.args.get('breakdown')
+        branch_id = request.args.get('branch_id', type=int)
 
-        start_date = datetime.utcnow() - timedelta(days=days)
-        reviews_query = Review.query.filter(Review.created_at >= start_date)
-        if branch_ids:
-            reviews_query = reviews_query.filter(Review.branch_id.in_(branch_ids))
-        reviews = reviews_query.all()
-        
-        # Group by date
-        trends = {}
-        for review in reviews:
-            date = review.created_at.date().isoformat()
-            if date not in trends:
-                trends[date] = {
-                    'total': 0,
-                    'avg_rating': 0,
-                    'positive': 0,
-                    'neutral': 0,
-                    'negative': 0
-                }
-            trends[date]['total'] += 1
-            trends[date]['positive'] += 1 if review.sentiment == 'positive' else 0
-            trends[date]['neutral'] += 1 if review.sentiment == 'neutral' else 0
-            trends[date]['negative'] += 1 if review.sentiment == 'negative' else 0
-        
-        # Calculate average ratings
-        for date, data in trends.items():
-            date_reviews = [r for r in reviews if r.created_at.date().isoformat() == date]
-            data['avg_rating'] = sum(r.rating for r in date_reviews) / len(date_reviews) if date_reviews else 0
-        
-        return jsonify(trends), 200
+        if granularity not in TREND_GRANULARITIES:
+            return jsonify({'message': 'Invalid granularity'}), 400
+        if breakdown and breakdown != 'branch' and breakdown not in BREAKDOWN_DIMENSIONS:
+            return jsonify({'message': 'Invalid breakdown'}), 400
+
+        if branch_id and not scope.allows(branch_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        versions = read_from_replica([branch_id] if branch_id else scope.branch_ids)
+        branch_ids = [b[0] for b in versions]
+
+        end_date = datetime.utcnow().date()
+        start_date = end_date - timedelta(days=days)
+        etag = make_etag(end_date, versions)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        params = {
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'granularity': granularity,
+            'breakdown': breakdown,
+            'versions': versions
+        }
+        trends, hit = analytics_cache.get_or_compute(
+            'trends', branch_cache_scopes(branch_ids), params,
+            lambda: rollup_trends(branch_ids, start_date, end_date, granularity, breakdown)
+        )
+        
+        response = with_validators(jsonify(trends), etag)
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response, 200
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 
-# ============ HELPER FUNCTIONS ============
+@app.route('/api/analytics/staff', methods=['GET'])
+@jwt_required()
+def get_staff_performance():
+    try:
+        scope = current_scope()
+        days = min(max(request.args.get('days', 30, type=int), 1), MAX_ANALYTICS_DAYS)
+        branch_id = request.args.get('branch_id', type=int)
+        sort = request.args.get('sort', 'reviews')
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+
+        if sort not in STAFF_SORT_KEYS:
+            return jsonify({'message': 'Invalid sort'}), 400
+        if branch_id and not scope.allows(branch_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        versions = read_from_replica([branch_id] if branch_id else scope.branch_ids)
+        branch_ids = [b[0] for b in versions]
+
+        end_date = datetime.utcnow().date()
+        start_date = end_date - timedelta(days=days)
+        etag = make_etag(end_date, versions, sort, limit)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        params = {'start': start_date.isoformat(), 'end': end_date.isoformat()}
+        staff, hit = analytics_cache.get_or_compute(
+            'staff', branch_cache_scopes(branch_ids), dict(params, versions=versions),
+            lambda: staff_performance(branch_ids, start_date, end_date)
+        )
+        ascending = sort == 'median_response_seconds'
+        ranked = sorted(
+            staff,
+            key=lambda row: (row[sort] is None, row[sort] if ascending else -(row[sort] or 0), row['staff_id'])
+        )
+
+        response = with_validators(jsonify({
+            'start': params['start'],
+            'end': params['end'],
+            'staff': ranked[:limit]
+        }), etag)
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response, 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/analytics/cache', methods=['GET'])
+@jwt_required()
+def get_analytics_cache_stats():
+    try:
+        if not current_scope().is_admin:
+            return jsonify({'message': 'Unauthorized'}), 403
+        return jsonify(analytics_cache.stats()), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
 
-def analyze_sentiment(rating, content):
-    """Simple sentiment analysis based on rating and keywords"""
-    positive_keywords = ['excellent', 'great', 'good', 'amazing', 'wonderful', 'fantastic', 'love', 'perfect']
-    negative_keywords = ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disgusting']
+# ============ METRICS ROUTES ============
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-route request, latency and SQL histograms for Prometheus (this worker only)"""
+    return app.response_class(
+        metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    ), 200
+
+
+# ============ STREAM ROUTES ============
+
+@jwt.token_verification_loader
+def _check_token_use(jwt_header, jwt_data):
+    """Stream tokens only open streams, and streams only accept stream tokens"""
+    return (jwt_data.get('use') == 'stream') == (request.endpoint == 'stream_events')
+
+
+@app.route('/api/stream/token', methods=['POST'])
+@jwt_required()
+def create_stream_token():
+    """Short-lived token for /api/stream, which EventSource has to pass in the URL"""
+    try:
+        claims = get_jwt()
+        stream_claims = {name: claims[name] for name in ('role', 'branches', 'sv') if name in claims}
+        # A stream stays open until the access token it was issued from expires
+        stream_claims.update(use='stream', stream_until=claims['exp'])
+        expires_in = app.config['STREAM_TOKEN_EXPIRES']
+        token = create_access_token(
+            identity=get_jwt_identity(), additional_claims=stream_claims, expires_delta=timedelta(seconds=expires_in)
+        )
+        return jsonify({'token': token, 'expires_in': expires_in}), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/stream', methods=['GET'])
+@jwt_required(locations=['query_string'])
+def stream_events():
+    """Server-Sent Events for reviews in the caller's branches.
+
+    EventSource cannot send headers, so clients open the stream with a token
+    from POST /api/stream/token as ?jwt=. The access token itself never goes
+    in a URL. The stream ends when that access token expires.
+    """
+    try:
+        branch_ids = current_scope().branch_ids
+        visible = set(branch_ids) if branch_ids is not None else None
+        expires_at = get_jwt()['stream_until']
+        subscription, missed = event_bus.subscribe(
+            lambda e: visible is None or e['branch_id'] in visible,
+            request.headers.get('Last-Event-ID', type=int)
+        )
+    except BusFull:
+        return jsonify({'message': 'Too many open streams, try again later'}), 503, {'Retry-After': '30'}
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+    heartbeat = app.config['EVENTS_HEARTBEAT']
     
-    content_lower = content.lower()
+    def frames():
+        try:
+            yield 'retry: 5000\n\n'
+            if missed:
+                yield format_sse('reset', {'reason': 'missed'})
+            while datetime.now(timezone.utc).timestamp() < expires_at:
+                events = subscription.wait(heartbeat)
+                if subscription.overflowed:
+                    yield format_sse('reset', {'reason': 'overflow'})
+                    return
+                # Comment lines keep proxies from timing the stream out and
+                # surface disconnected clients at the next write
+                if not events:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield ''.join(format_sse(e['type'], e['data'], e['id']) for e in events)
+        finally:
+            event_bus.unsubscribe(subscription)
     
-    positive_count = sum(1 for keyword in positive_keywords if keyword in content_lower)
-    negative_count = sum(1 for keyword in negative_keywords if keyword in content_lower)
+    return app.response_class(
+        frames(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ============ HELPER FUNCTIONS ============
+
+def dashboard_summary(branch_ids):
+    """Build the dashboard payload from the per-branch counters, one row per branch"""
+    branches = {branch.id: branch for branch in Branch.query.filter(Branch.id.in_(branch_ids))}
+
+    total_reviews = 0
+    rating_sum = 0
+    responded = 0
+    sentiments = {'positive': 0, 'neutral': 0, 'negative': 0}
+    branch_stats = []
+    for branch_id in branch_ids:
+        branch = branches.get(branch_id)
+        if branch is None:
+            continue
+        total_reviews += branch.total_reviews
+        rating_sum += branch.rating_sum
+        responded += branch.responded_count
+        for sentiment in sentiments:
+            sentiments[sentiment] += getattr(branch, f'{sentiment}_count')
+        branch_stats.append({
+            'branch_id': branch_id,
+            'branch_name': branch.name,
+            'avg_rating': branch.stats()['avg_rating'],
+            'total_reviews': branch.total_reviews
+        })
+
+    avg_rating = rating_sum / total_reviews if total_reviews else 0
+    response_rate = (responded / total_reviews * 100) if total_reviews > 0 else 0
+
+    return {
+        'total_reviews': total_reviews,
+        'avg_rating': round(avg_rating, 2),
+        'response_rate': round(response_rate, 2),
+        'sentiments': sentiments,
+        'branch_stats': branch_stats
+    }
+
+
+def analyze_sentiment(rating, content, category=None):
+    """Sentiment label from the star rating and the review text, see sentiment.py"""
+    return sentiment_engine.analyze(rating, content, category)
+
+
+def analyze_sentiment_batch(ratings, contents, categories=None):
+    """Sentiment labels for parallel lists of ratings and review texts"""
+    return sentiment_engine.score_batch(contents, ratings, categories)
+
+
+# Optional string columns a bulk-import row may set, checked against their lengths
+BULK_TEXT_FIELDS = ('title', 'source', 'category', 'customer_name', 'customer_email', 'customer_phone')
+BULK_ROW_REJECTED = 'Row rejected by the database'
+BULK_CHUNK_FAILED = 'Could not store this row; retry the import'
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+ANALYTICS_COUNTERS = (
+    'total_reviews', 'rating_sum', 'positive_count', 'neutral_count',
+    'negative_count', 'responded_count'
+)
+# Columns of Branch holding its all-time review counters
+BRANCH_COUNTERS = ANALYTICS_COUNTERS + ('escalated_count',)
+BREAKDOWN_DIMENSIONS = ('source', 'category')
+BREAKDOWN_UNKNOWN = 'unknown'
+BATCH_ACTIONS = ('respond', 'escalate', 'unescalate')
+BATCH_FILTERS = ('branch_id', 'sentiment', 'category', 'source', 'rating', 'is_responded', 'is_escalated')
+REPLY_PLACEHOLDERS = ('customer_name', 'branch_name', 'category', 'staff_name')
+TREND_GRANULARITIES = ('day', 'week', 'month')
+MAX_ANALYTICS_DAYS = 730
+TREND_COUNTERS = ('total_reviews', 'rating_sum', 'positive_count', 'neutral_count', 'negative_count')
+STAFF_SORT_KEYS = ('reviews', 'avg_rating', 'responses', 'median_response_seconds')
+
+
+def reply_values(review):
+    """Values for the REPLY_PLACEHOLDERS of a reply template, see reply_templates.py"""
+    return {
+        'customer_name': review.customer_name or 'valued customer',
+        'branch_name': review.branch.name if review.branch else '',
+        'category': review.category or '',
+        'staff_name': review.staff.full_name if review.staff else 'our team'
+    }
+
+
+def export_review_chunks(reviews, fields, export_format, batch_size):
+    """Encode reviews as CSV or NDJSON text, one chunk per batch_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(fields)
+    for count, review in enumerate(reviews, 1):
+        row = serialize_review(review, fields)
+        if writer:
+            writer.writerow([row[field] for field in fields])
+        else:
+            buffer.write(json.dumps(row) + '\n')
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_review_cursor(review):
+    """Opaque keyset cursor pointing just past review in (created_at, id) order"""
+    raw = json.dumps([review.created_at.isoformat(), review.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_review_cursor(cursor):
+    """Inverse of encode_review_cursor; raises ValueError on malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, review_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _ndjson_rows(stream):
+    """Parse a newline-delimited JSON body lazily; undecodable lines yield None
+    so they are reported as invalid rows"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def validate_batch_filter(filters):
+    """Check the value types of a batch moderation filter; raises ValueError"""
+    for name, value in filters.items():
+        if name in ('is_responded', 'is_escalated'):
+            if not isinstance(value, bool):
+                raise ValueError(f'filter.{name} must be true or false')
+        elif name in ('branch_id', 'rating'):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f'filter.{name} must be an integer')
+        elif not isinstance(value, str):
+            raise ValueError(f'filter.{name} must be a string')
+
+
+def validate_bulk_review(data, allowed_branch_ids, known_staff_ids):
+    """Normalize one bulk-import row into reviews column values; raises ValueError.
+
+    Checks everything the database would reject, so a valid row never fails
+    the insert of the chunk it is in.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Row must be a JSON object')
     
-    if rating >= 4:
-        return 'positive'
-    elif rating <= 2:
-        return 'negative'
+    branch_id = data.get('branch_id')
+    if not isinstance(branch_id, int) or branch_id not in allowed_branch_ids:
+        raise ValueError('Unknown or unauthorized branch_id')
+    rating = data.get('rating')
+    if not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5:
+        raise ValueError('rating must be an integer from 1 to 5')
+    content = data.get('content')
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError('content is required')
+    text = {}
+    for name in BULK_TEXT_FIELDS:
+        value = data.get(name)
+        if value is None or value == '':
+            text[name] = None
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'{name} must be a string')
+        max_length = Review.__table__.c[name].type.length
+        if len(value) > max_length:
+            raise ValueError(f'{name} must be at most {max_length} characters')
+        text[name] = value
+    staff_id = data.get('staff_id')
+    if staff_id is not None and (
+        not isinstance(staff_id, int) or isinstance(staff_id, bool) or staff_id not in known_staff_ids
+    ):
+        raise ValueError('Unknown staff_id')
+    
+    created_at = data.get('created_at')
+    if created_at is None:
+        created_at = datetime.utcnow()
     else:
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
+        try:
+            created_at = datetime.fromisoformat(str(created_at).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('created_at must be an ISO 8601 timestamp')
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    return {
+        'branch_id': branch_id,
+        'rating': rating,
+        'title': text['title'],
+        'content': content,
+        'source': text['source'] or 'internal',
+        'category': text['category'],
+        'sentiment': None,
+        'customer_name': text['customer_name'],
+        'customer_email': text['customer_email'],
+        'customer_phone': text['customer_phone'],
+        'staff_id': staff_id,
+        'is_responded': False,
+        'is_escalated': False,
+        'created_at': created_at,
+        'updated_at': created_at
+    }
+
+
+def _insert_review_chunk(chunk, errors):
+    """Insert validated (index, row) pairs in one transaction; returns the number inserted.
+
+    If the database still rejects the chunk, its rows are retried one by one
+    so only the offending rows fail.
+    """
+    rows = [row for _, row in chunk]
+    sentiments = analyze_sentiment_batch(
+        [r['rating'] for r in rows], [r['content'] for r in rows], [r['category'] for r in rows]
+    )
+    for row, sentiment in zip(rows, sentiments):
+        row['sentiment'] = sentiment
+    
+    try:
+        _store_review_rows(rows)
+        return len(rows)
+    except (IntegrityError, DataError):
+        db.session.rollback()
+        if len(chunk) == 1:
+            errors.append({'index': chunk[0][0], 'message': BULK_ROW_REJECTED})
+            return 0
+    except Exception:
+        db.session.rollback()
+        app.logger.exception('Bulk import chunk failed')
+        errors.extend({'index': index, 'message': BULK_CHUNK_FAILED} for index, _ in chunk)
+        return 0
+    
+    inserted = 0
+    for index, row in chunk:
+        try:
+            _store_review_rows([row])
+            inserted += 1
+        except (IntegrityError, DataError):
+            db.session.rollback()
+            errors.append({'index': index, 'message': BULK_ROW_REJECTED})
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('Bulk import row failed')
+            errors.append({'index': index, 'message': BULK_CHUNK_FAILED})
+    return inserted
+
+
+def _store_review_rows(rows):
+    """Insert review rows with their rollup jobs and events, and commit"""
+    db.session.execute(Review.__table__.insert(), rows)
+    reviews = [SimpleNamespace(**row) for row in rows]
+    enqueue_review_deltas((review, review_analytics_delta(review)) for review in reviews)
+    # One event per branch and chunk; subscribers refetch rather than patch
+    imported = Counter(row['branch_id'] for row in rows)
+    for branch_id, count in sorted(imported.items()):
+        publish_event('reviews.imported', branch_id, {'branch_id': branch_id, 'count': count})
+    db.session.commit()
+
+
+def review_analytics_delta(review):
+    """Rollup counters contributed by a single review"""
+    delta = {
+        'total_reviews': 1,
+        'rating_sum': review.rating,
+        'responded_count': 1 if review.is_responded else 0
+    }
+    if review.sentiment in ('positive', 'neutral', 'negative'):
+        delta[f'{review.sentiment}_count'] = 1
+    return delta
+
+
+def apply_review_deltas(changes):
+    """Apply (review, delta) pairs, folding them into one upsert per touched rollup row"""
+    rollups = {}
+    for review, delta in changes:
+        date = review.created_at.date()
+        keys = [(Analytics, (review.branch_id, date))]
+        for dimension in BREAKDOWN_DIMENSIONS:
+            value = getattr(review, dimension) or BREAKDOWN_UNKNOWN
+            keys.append((AnalyticsBreakdown, (review.branch_id, date, dimension, value)))
+        for key in keys:
+            totals = rollups.setdefault(key, dict.fromkeys(ANALYTICS_COUNTERS, 0))
+            for name, amount in delta.items():
+                totals[name] += amount
+
+    for (model, key), delta in rollups.items():
+        names = ('branch_id', 'date', 'dimension', 'value')[:len(key)]
+        _upsert_counters(model, dict(zip(names, key)), delta)
+    mark_branches_changed({key[0] for _, key in rollups})
+
+
+def _upsert_counters(model, keys, delta):
+    table = model.__table__
+    values = {name: delta.get(name, 0) for name in ANALYTICS_COUNTERS}
+    has_rates = 'avg_rating' in table.c
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        row = dict(keys, **values)
+        if has_rates:
+            total = values['total_reviews']
+            row['avg_rating'] = values['rating_sum'] / total if total else 0.0
+            row['response_rate'] = values['responded_count'] / total * 100 if total else 0.0
+            row['created_at'] = datetime.utcnow()
+        stmt = insert(table).values(**row)
+        updated = {name: table.c[name] + stmt.excluded[name] for name in ANALYTICS_COUNTERS}
+        if has_rates:
+            new_total = updated['total_reviews']
+            updated['avg_rating'] = db.case(
+                (new_total > 0, db.cast(updated['rating_sum'], db.Float) / new_total), else_=0.0
+            )
+            updated['response_rate'] = db.case(
+                (new_total > 0, db.cast(updated['responded_count'], db.Float) * 100 / new_total), else_=0.0
+            )
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=updated)
+        db.session.execute(stmt)
+        return
+
+    # Generic fallback for dialects without INSERT .. ON CONFLICT
+    row = model.query.filter_by(**keys).with_for_update().first()
+    if row is None:
+        row = model(**keys, **{name: 0 for name in ANALYTICS_COUNTERS})
+        db.session.add(row)
+    for name in ANALYTICS_COUNTERS:
+        setattr(row, name, (getattr(row, name) or 0) + values[name])
+    if has_rates:
+        row.avg_rating = row.rating_sum / row.total_reviews if row.total_reviews else 0.0
+        row.response_rate = row.responded_count / row.total_reviews * 100 if row.total_reviews else 0.0
+    db.session.flush()
+
+
+def _counter_columns():
+    """SQL aggregates over reviews matching ANALYTICS_COUNTERS order"""
+    def flag_sum(condition):
+        return db.func.sum(db.case((condition, 1), else_=0))
+
+    return [
+        db.func.count(Review.id),
+        db.func.sum(Review.rating),
+        flag_sum(Review.sentiment == 'positive'),
+        flag_sum(Review.sentiment == 'neutral'),
+        flag_sum(Review.sentiment == 'negative'),
+        flag_sum(Review.is_responded)
+    ]
+
+
+def count_branch_reviews(branch_ids=None):
+    """{branch_id: BRANCH_COUNTERS} recomputed from the reviews table in one grouped pass"""
+    stmt = db.select(
+        Review.branch_id, *_counter_columns(), db.func.sum(db.case((Review.is_escalated, 1), else_=0))
+    ).group_by(Review.branch_id)
+    if branch_ids is not None:
+        stmt = stmt.where(Review.branch_id.in_(branch_ids))
+    counts = {branch_id: dict.fromkeys(BRANCH_COUNTERS, 0) for branch_id in branch_ids or ()}
+    for branch_id, *values in db.session.execute(stmt):
+        counts[branch_id] = dict(zip(BRANCH_COUNTERS, (value or 0 for value in values)))
+    return counts
+
+
+def store_branch_counts(counts):
+    """Overwrite the counters of the branches in counts ({branch_id: BRANCH_COUNTERS})"""
+    if not counts:
+        return
+    table = Branch.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == db.bindparam('b_id'))
+        .values(updated_at=table.c.updated_at, **{name: db.bindparam(f'v_{name}') for name in BRANCH_COUNTERS}),
+        [
+            dict({f'v_{name}': counts[branch_id][name] for name in BRANCH_COUNTERS}, b_id=branch_id)
+            for branch_id in sorted(counts)
+        ]
+    )
+    mark_branches_changed(counts)
+
+
+def discard_rollup_jobs(start_date, end_date, branch_ids=None):
+    """Drop queued rollup deltas for [start_date, end_date] so a rebuild does not count them twice.
+
+    Runs in the caller's transaction and locks the jobs it reads, so no
+    worker can claim them before the rebuild commits. Raises RuntimeError if
+    a worker is already applying one of them.
+    """
+    first, last = start_date.isoformat(), end_date.isoformat()
+    query = Job.query.filter(Job.kind == 'analytics.rollup')
+    if branch_ids:
+        query = query.filter(Job.coalesce_key.in_([f'branch:{branch_id}' for branch_id in branch_ids]))
+    discarded = 0
+    for job in query.order_by(Job.id).with_for_update():
+        rows = [row for row in job.payload['rows'] if not first <= row[0] <= last]
+        if len(rows) == len(job.payload['rows']):
+            continue
+        if job.status == 'running':
+            raise RuntimeError(f'Job {job.id} is applying rollups for these days; retry once the worker is done')
+        if rows:
+            job.payload = dict(job.payload, rows=rows)
         else:
-            return 'neutral'
+            db.session.delete(job)
+        discarded += 1
+    return discarded
+
+
+def rebuild_analytics(start_date, end_date, branch_ids=None):
+    """Recompute the rollup rows for [start_date, end_date] from reviews in one set-based pass"""
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    day = db.func.date(Review.created_at)
+    rows = 0
+    # The rebuilt rows already include every review the queued deltas describe
+    discard_rollup_jobs(start_date, end_date, branch_ids)
+
+    def in_range(stmt):
+        stmt = stmt.where(Review.created_at >= start, Review.created_at < end)
+        if branch_ids:
+            stmt = stmt.where(Review.branch_id.in_(branch_ids))
+        return stmt
+
+    for model in (Analytics, AnalyticsBreakdown):
+        table = model.__table__
+        delete = table.delete().where(table.c.date >= start_date, table.c.date <= end_date)
+        if branch_ids:
+            delete = delete.where(table.c.branch_id.in_(branch_ids))
+        db.session.execute(delete)
+
+    counters = _counter_columns()
+    total, rating_sum, responded = counters[0], counters[1], counters[5]
+    select = in_range(db.select(
+        Review.branch_id,
+        day,
+        *counters,
+        db.cast(rating_sum, db.Float) / total,
+        db.cast(responded, db.Float) * 100 / total,
+        db.func.now()
+    )).group_by(Review.branch_id, day)
+    insert = Analytics.__table__.insert().from_select(
+        ['branch_id', 'date', *ANALYTICS_COUNTERS, 'avg_rating', 'response_rate', 'created_at'],
+        select
+    )
+    rows += db.session.execute(insert).rowcount
+
+    for dimension in BREAKDOWN_DIMENSIONS:
+        value = db.func.coalesce(getattr(Review, dimension), BREAKDOWN_UNKNOWN)
+        select = in_range(db.select(
+            Review.branch_id,
+            day,
+            db.literal(dimension),
+            value,
+            *_counter_columns()
+        )).group_by(Review.branch_id, day, value)
+        insert = AnalyticsBreakdown.__table__.insert().from_select(
+            ['branch_id', 'date', 'dimension', 'value', *ANALYTICS_COUNTERS],
+            select
+        )
+        db.session.execute(insert)
+
+    mark_branches_changed(branch_ids or db.session.scalars(db.select(Branch.id)))
+    return rows
+
+
+def trend_bucket(date, granularity):
+    """Start date of the day/week/month bucket containing date"""
+    if granularity == 'week':
+        return date - timedelta(days=date.weekday())
+    if granularity == 'month':
+        return date.replace(day=1)
+    return date
+
+
+def _trend_stats(total=0, rating_sum=0, positive=0, neutral=0, negative=0):
+    return {
+        'total': total,
+        'avg_rating': rating_sum / total if total else 0,
+        'positive': positive,
+        'neutral': neutral,
+        'negative': negative
+    }
+
+
+def rollup_trends(branch_ids, start_date, end_date, granularity='day', breakdown=None):
+    """Zero-filled trend series read from the daily rollup tables"""
+    def sums(model):
+        return [db.func.sum(getattr(model, name)) for name in TREND_COUNTERS]
+
+    def scoped(query, model):
+        return query.filter(
+            model.date >= start_date,
+            model.date <= end_date,
+            model.branch_id.in_(branch_ids)
+        )
+
+    # Every bucket in the window is present, even without reviews
+    buckets = {}
+    date = start_date
+    while date <= end_date:
+        buckets.setdefault(trend_bucket(date, granularity), [0, 0, 0, 0, 0])
+        date += timedelta(days=1)
+    groups = {key: {} for key in buckets}
+
+    for date, *counts in scoped(db.session.query(Analytics.date, *sums(Analytics)), Analytics).group_by(Analytics.date):
+        acc = buckets[trend_bucket(date, granularity)]
+        for i, count in enumerate(counts):
+            acc[i] += count or 0
+
+    if breakdown == 'branch':
+        rows = scoped(db.session.query(Analytics.date, Analytics.branch_id, *sums(Analytics)), Analytics).group_by(
+            Analytics.date, Analytics.branch_id
+        )
+    elif breakdown in BREAKDOWN_DIMENSIONS:
+        rows = scoped(
+            db.session.query(AnalyticsBreakdown.date, AnalyticsBreakdown.value, *sums(AnalyticsBreakdown)),
+            AnalyticsBreakdown
+        ).filter(AnalyticsBreakdown.dimension == breakdown).group_by(
+            AnalyticsBreakdown.date, AnalyticsBreakdown.value
+        )
+    else:
+        rows = []
+    for date, key, *counts in rows:
+        acc = groups[trend_bucket(date, granularity)].setdefault(str(key), [0, 0, 0, 0, 0])
+        for i, count in enumerate(counts):
+            acc[i] += count or 0
+
+    trends = {}
+    for bucket, counts in buckets.items():
+        stats = _trend_stats(*counts)
+        if breakdown:
+            stats['breakdown'] = {key: _trend_stats(*values) for key, values in groups[bucket].items()}
+        trends[bucket.isoformat()] = stats
+    return trends
 
 
-def update_analytics(branch_id):
-    """Update analytics for a branch"""
+def response_seconds():
+    """SQL expression for a review's time to first response in seconds"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return (db.func.julianday(Review.responded_at) - db.func.julianday(Review.created_at)) * 86400
+    return db.func.extract('epoch', Review.responded_at - Review.created_at)
+
+
+def staff_performance(branch_ids, start_date, end_date):
+    """Per-staff review volume, rating and response times for reviews in [start_date, end_date].
+
+    Reviews count towards the staff member they are tagged with (staff_id) by
+    creation date; responses count towards the responder by response date.
+    Median and p90 response times are nearest-rank percentiles picked with
+    window functions, so only one row per staff member leaves the database.
+    """
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    tagged = db.session.execute(db.select(
+        Review.staff_id,
+        db.func.count(Review.id),
+        db.func.avg(Review.rating)
+    ).where(
+        Review.branch_id.in_(branch_ids),
+        Review.created_at >= start,
+        Review.created_at < end,
+        Review.staff_id.isnot(None)
+    ).group_by(Review.staff_id)).all()
+
+    seconds = response_seconds()
+    responses = db.select(
+        Review.responded_by.label('staff_id'),
+        seconds.label('seconds'),
+        db.func.row_number().over(partition_by=Review.responded_by, order_by=seconds).label('rank'),
+        db.func.count().over(partition_by=Review.responded_by).label('total')
+    ).where(
+        Review.branch_id.in_(branch_ids),
+        Review.responded_at >= start,
+        Review.responded_at < end,
+        Review.responded_by.isnot(None)
+    ).subquery()
+
+    def nearest_rank(pct):
+        return db.func.max(db.case(
+            (responses.c.rank == (responses.c.total * pct + 99) // 100, responses.c.seconds)
+        ))
+
+    responded = db.session.execute(db.select(
+        responses.c.staff_id,
+        db.func.max(responses.c.total),
+        db.func.avg(responses.c.seconds),
+        nearest_rank(50),
+        nearest_rank(90)
+    ).group_by(responses.c.staff_id)).all()
+
+    # PostgreSQL returns AVG and EXTRACT as Decimal, which JSON cannot encode as a number
+    def seconds_or_none(value):
+        return round(float(value), 1) if value is not None else None
+
+    stats = {}
+    for staff_id, count, avg_rating in tagged:
+        stats[staff_id] = {'reviews': count, 'avg_rating': round(float(avg_rating), 2)}
+    for staff_id, count, avg_seconds, median, p90 in responded:
+        stats.setdefault(staff_id, {}).update({
+            'responses': count,
+            'avg_response_seconds': seconds_or_none(avg_seconds),
+            'median_response_seconds': seconds_or_none(median),
+            'p90_response_seconds': seconds_or_none(p90)
+        })
+
+    users = db.session.execute(
+        db.select(User.id, User.full_name, User.branch_id).where(User.id.in_(stats))
+    ).all()
+    return [
+        dict({
+            'staff_id': user_id,
+            'full_name': full_name,
+            'branch_id': home_branch_id,
+            'reviews': 0,
+            'avg_rating': None,
+            'responses': 0,
+            'avg_response_seconds': None,
+            'median_response_seconds': None,
+            'p90_response_seconds': None
+        }, **stats[user_id])
+        for user_id, full_name, home_branch_id in users
+    ]
+
+
+# ============ CLI COMMANDS ============
+
+@app.cli.command('analytics-backfill')
+@click.option('--start', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='First day to rebuild (default: earliest review).')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Last day to rebuild (default: today).')
+@click.option('--branch-id', 'branch_ids', type=int, multiple=True,
+              help='Limit the rebuild to these branches (repeatable).')
+def analytics_backfill(start, end, branch_ids):
+    """Rebuild Analytics rollup rows for a date range."""
+    if start is None:
+        first = db.session.query(db.func.min(Review.created_at)).scalar()
+        if first is None:
+            click.echo('No reviews found; nothing to backfill.')
+            return
+        start = first
+    end = end or datetime.utcnow()
+
     try:
-        today = datetime.utcnow().date()
-        
-        reviews = Review.query.filter_by(branch_id=branch_id).filter(
-            db.func.date(Review.created_at) == today
-        ).all()
-        
-        if reviews:
-            total = len(reviews)
-            avg_rating = sum(r.rating for r in reviews) / total
-            responded = sum(1 for r in reviews if r.is_responded)
-            response_rate = (responded / total * 100) if total > 0 else 0
-            positive = sum(1 for r in reviews if r.sentiment == 'positive')
-            neutral = sum(1 for r in reviews if r.sentiment == 'neutral')
-            negative = sum(1 for r in reviews if r.sentiment == 'negative')
-            
-            analytics = Analytics.query.filter_by(
-                branch_id=branch_id,
-                date=today
-            ).first()
-            
-            if analytics:
-                analytics.total_reviews = total
-                analytics.avg_rating = avg_rating
-                analytics.response_rate = response_rate
-                analytics.positive_count = positive
-                analytics.neutral_count = neutral
-                analytics.negative_count = negative
-            else:
-                analytics = Analytics(
-                    branch_id=branch_id,
-                    date=today,
-                    total_reviews=total,
-                    avg_rating=avg_rating,
-                    response_rate=response_rate,
-                    positive_count=positive,
-                    neutral_count=neutral,
-                    negative_count=negative
-                )
-                db.session.add(analytics)
-            
-            db.session.commit()
-    except Exception as e:
-        print(f"Error updating analytics: {e}")
+        rows = rebuild_analytics(start.date(), end.date(), list(branch_ids) or None)
+    except RuntimeError as e:
         db.session.rollback()
+        raise click.ClickException(str(e))
+    db.session.commit()
+    click.echo(f'Rebuilt {rows} analytics rows from {start.date()} to {end.date()}.')
+
+
+@app.cli.command('branch-stats-check')
+@click.option('--repair', is_flag=True, help='Reset mismatched counters from the reviews table.')
+def branch_stats_check(repair):
+    """Compare the per-branch review counters with the reviews table."""
+    stored = {
+        branch.id: {name: getattr(branch, name) for name in BRANCH_COUNTERS}
+        for branch in Branch.query.order_by(Branch.id)
+    }
+    counted = count_branch_reviews(list(stored))
+    mismatched = [branch_id for branch_id in stored if stored[branch_id] != counted[branch_id]]
+    for branch_id in mismatched:
+        diff = ', '.join(
+            f'{name} {stored[branch_id][name]} != {counted[branch_id][name]}'
+            for name in BRANCH_COUNTERS if stored[branch_id][name] != counted[branch_id][name]
+        )
+        click.echo(f'branch {branch_id}: {diff}')
+    db.session.rollback()
+    if not mismatched:
+        click.echo(f'All {len(stored)} branch counters match their reviews.')
+        return
+    if not repair:
+        raise click.ClickException(f'{len(mismatched)} branches have drifted; rerun with --repair')
+
+    for branch_id in mismatched:
+        # Writers update the branch row as they commit, so recount under its lock
+        db.session.execute(db.select(Branch.id).where(Branch.id == branch_id).with_for_update())
+        store_branch_counts(count_branch_reviews([branch_id]))
+        db.session.commit()
+    click.echo(f'Repaired {len(mismatched)} branches.')
+
+
+def _hot_queries():
+    """Representative statements for the hot read paths, as (name, statement) pairs"""
+    now = datetime.utcnow()
+    newest = (Review.created_at.desc(), Review.id.desc())
+    reviews = db.select(Review)
+    return [
+        ('reviews: all, newest first', reviews.order_by(*newest).limit(10)),
+        ('reviews: branch', reviews.where(Review.branch_id == 1).order_by(*newest).limit(10)),
+        ('reviews: branch + sentiment',
+         reviews.where(Review.branch_id == 1, Review.sentiment == 'negative').order_by(*newest).limit(10)),
+        ('reviews: branch + category',
+         reviews.where(Review.branch_id == 1, Review.category == 'food').order_by(*newest).limit(10)),
+        ('reviews: branch + source',
+         reviews.where(Review.branch_id == 1, Review.source == 'google').order_by(*newest).limit(10)),
+        ('reviews: sentiment queue', reviews.where(Review.sentiment == 'negative').order_by(*newest).limit(10)),
+        ('reviews: branch cursor seek', reviews.where(
+            Review.branch_id == 1,
+            Review.created_at <= now,
+            db.or_(Review.created_at < now, Review.id < 1000)
+        ).order_by(*newest).limit(10)),
+        ('reviews: created_at range', db.select(Review.branch_id, db.func.count(Review.id)).where(
+            Review.created_at >= now - timedelta(days=1), Review.created_at < now
+        ).group_by(Review.branch_id)),
+        ('dashboard: branch aggregate', db.select(Review.sentiment, db.func.count(Review.id)).where(
+            Review.branch_id.in_([1, 2])
+        ).group_by(Review.sentiment)),
+        ('analytics: trends window', db.select(Analytics.date, db.func.sum(Analytics.total_reviews)).where(
+            Analytics.branch_id.in_([1, 2]), Analytics.date >= now.date() - timedelta(days=30)
+        ).group_by(Analytics.date)),
+        ('staff: tagged reviews', db.select(Review.staff_id, db.func.count(Review.id)).where(
+            Review.branch_id.in_([1, 2]), Review.created_at >= now - timedelta(days=30),
+            Review.staff_id.isnot(None)
+        ).group_by(Review.staff_id)),
+        ('staff: responses', db.select(Review.responded_by, db.func.count(Review.id)).where(
+            Review.branch_id.in_([1, 2]), Review.responded_at >= now - timedelta(days=30),
+            Review.responded_by.isnot(None)
+        ).group_by(Review.responded_by)),
+        ('branches: manager scope', db.select(Branch.id).where(Branch.manager_id == 1)),
+    ]
+
+
+def explain_uses_index(stmt):
+    """Run EXPLAIN for stmt and return (uses_index, plan lines).
+
+    A plan passes when no table is read with a full sequential scan.
+    """
+    engine = db.engine
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif dialect == 'postgresql':
+        prefix = 'EXPLAIN (FORMAT JSON) '
+    else:
+        raise click.ClickException(f'EXPLAIN check is not supported on {dialect}')
+
+    def add_prefix(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    with engine.connect() as conn:
+        if dialect == 'postgresql':
+            # Tiny tables make a sequential scan look cheapest; ask whether
+            # an index path exists at all
+            conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        event.listen(conn, 'before_cursor_execute', add_prefix, retval=True)
+        try:
+            rows = conn.execute(stmt).cursor.fetchall()
+        finally:
+            event.remove(conn, 'before_cursor_execute', add_prefix)
+        conn.rollback()
+
+    if dialect == 'sqlite':
+        lines = [row[-1] for row in rows]
+        full_scans = [line for line in lines if line.startswith('SCAN') and 'USING' not in line]
+        return not full_scans, lines
+
+    plan = rows[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    lines = []
+    pending = [plan[0]['Plan']]
+    while pending:
+        node = pending.pop()
+        lines.append(' '.join(filter(None, [node['Node Type'], node.get('Relation Name'), node.get('Index Name')])))
+        pending.extend(node.get('Plans', []))
+    return not any(line.startswith('Seq Scan') for line in lines), lines
+
+
+@app.cli.command('worker')
+@click.option('--batch-size', default=100, show_default=True, help='Jobs claimed per batch.')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds to sleep when the queue is empty.')
+@click.option('--once', is_flag=True, help='Exit once no due jobs remain.')
+def worker(batch_size, poll_interval, once):
+    """Run queued background jobs."""
+    if not isinstance(job_queue.backend, DatabaseJobBackend):
+        raise click.ClickException('JOB_BACKEND=inline runs jobs in the request; no worker is needed')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    click.echo('Worker started.')
+    try:
+        job_queue.work(batch_size=batch_size, poll_interval=poll_interval, once=once)
+    except KeyboardInterrupt:
+        pass
+
+
+def _sentiment_chunks(chunk_size):
+    """Reviews in id order, chunk_size rows at a time, with the columns rescoring needs"""
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            Review.id, Review.branch_id, Review.created_at, Review.rating, Review.content,
+            Review.source, Review.category, Review.sentiment
+        ).filter(Review.id > last_id).order_by(Review.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def _apply_rescored_chunk(rows, labels):
+    """Store changed labels and move the matching rollup counters; returns the number changed"""
+    now = datetime.utcnow()
+    changed = [(row, label) for row, label in zip(rows, labels) if row.sentiment != label]
+    if changed:
+        db.session.execute(
+            db.update(Review),
+            [{'id': row.id, 'sentiment': label, 'updated_at': now} for row, label in changed]
+        )
+        deltas = []
+        for row, label in changed:
+            delta = {f'{label}_count': 1}
+            if row.sentiment in ('positive', 'neutral', 'negative'):
+                delta[f'{row.sentiment}_count'] = -1
+            deltas.append((row, delta))
+        apply_review_deltas(deltas)
+        add_branch_counts(deltas)
+    db.session.commit()
+    return len(changed)
+
+
+@app.cli.command('rescore-sentiment')
+@click.option('--chunk-size', default=5000, show_default=True, help='Reviews scored per task.')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True,
+              help='Scoring processes; 1 scores in this process.')
+def rescore_sentiment(chunk_size, workers):
+    """Re-score every review with the current sentiment engine and update rollups."""
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def submit(rows):
+        args = ([r.content for r in rows], [r.rating for r in rows], [r.category for r in rows])
+        if executor:
+            return executor.submit(sentiment_engine.score_batch, *args)
+        future = Future()
+        future.set_result(sentiment_engine.score_batch(*args))
+        return future
+
+    started = perf_counter()
+    scored = changed = 0
+    pending = deque()
+    try:
+        # Keep a bounded number of chunks in flight so memory stays flat
+        for rows in _sentiment_chunks(chunk_size):
+            pending.append((rows, submit(rows)))
+            if len(pending) > max(workers, 1) * 2:
+                rows, future = pending.popleft()
+                changed += _apply_rescored_chunk(rows, future.result())
+                scored += len(rows)
+        while pending:
+            rows, future = pending.popleft()
+            changed += _apply_rescored_chunk(rows, future.result())
+            scored += len(rows)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    elapsed = perf_counter() - started
+    rate = scored / elapsed if elapsed else 0
+    click.echo(f'Rescored {scored} reviews ({changed} changed) in {elapsed:.1f}s, {rate:,.0f} reviews/sec.')
+
+
+@app.cli.command('generate-dataset')
+@click.option('--reviews', default=1_000_000, show_default=True, help='Reviews to generate.')
+@click.option('--branches', default=50, show_default=True, help='Branches to create.')
+@click.option('--days', default=365, show_default=True, help='Days of history, ending today.')
+@click.option('--seed', default=42, show_default=True, help='RNG seed; the same seed gives the same dataset.')
+@click.option('--workers', default=1, show_default=True, help='Processes synthesizing rows.')
+@click.option('--chunk-size', default=20_000, show_default=True, help='Rows per insert transaction.')
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+def generate_dataset_command(reviews, branches, days, seed, workers, chunk_size, reset):
+    """Fill an empty database with a large, deterministic load-test dataset."""
+    from seed_reviews import generate_dataset
+    
+    if reset:
+        db.drop_all()
+        db.create_all()
+    
+    def progress(done, total):
+        if done == total or done % (chunk_size * 10) == 0:
+            click.echo(f'  {done:,}/{total:,} reviews')
+    
+    started = perf_counter()
+    try:
+        inserted = generate_dataset(reviews, branches, days, seed=seed, workers=workers,
+                                    chunk_size=chunk_size, progress=progress)
+    except ValueError as e:
+        raise click.ClickException(f'{e}; pass --reset to replace it')
+    elapsed = perf_counter() - started
+    rate = inserted / elapsed if elapsed else 0
+    click.echo(f'Generated {inserted:,} reviews across {branches} branches in {elapsed:.1f}s, {rate:,.0f} reviews/sec.')
+
+
+@app.cli.command('explain-check')
+def explain_check():
+    """Assert that every hot query is served by an index."""
+    failures = 0
+    for name, stmt in _hot_queries():
+        ok, lines = explain_uses_index(stmt)
+        failures += not ok
+        click.echo(f"{'ok  ' if ok else 'FAIL'}  {name}")
+        for line in lines:
+            click.echo(f'        {line}')
+    if failures:
+        raise click.ClickException(f'{failures} hot queries do not use an index')
+    click.echo('All hot queries use an index.')
 
 
 # ============ ERROR HANDLERS ============
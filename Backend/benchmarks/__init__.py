@@ -0,0 +1,24 @@
+"""
+API benchmarks against generated datasets.
+
+    python -m benchmarks run --scales 10k,100k --output results.json
+    python -m benchmarks compare benchmarks/baseline.json results.json
+
+Each scale runs in its own process against a copy of a SQLite dataset made
+by ``flask generate-dataset`` (cached under ``benchmarks/data``), so peak
+RSS and per-process caches are measured per scale.
+"""
+import math
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
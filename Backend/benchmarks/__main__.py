@@ -0,0 +1,244 @@
+"""
+Run the API benchmarks or compare a run against a stored baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks import SCALES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'data')
+
+
+def _sqlite_url(path):
+    return 'sqlite:///' + os.path.abspath(path).replace('\\', '/')
+
+
+def _env(database_path, warm_cache):
+    env = dict(os.environ, DATABASE_URL=_sqlite_url(database_path))
+    if not warm_cache:
+        # Measure the analytics queries rather than the response cache
+        env['ANALYTICS_CACHE_TTL'] = '0'
+    return env
+
+
+def ensure_dataset(scale, data_dir, seed, workers):
+    """Path of the generated dataset for scale, creating it on first use"""
+    path = os.path.join(data_dir, f'reviews-{scale}-seed{seed}.db')
+    if os.path.exists(path):
+        return path
+    os.makedirs(data_dir, exist_ok=True)
+    print(f'Generating {scale} dataset at {path}...', file=sys.stderr)
+    partial = path + '.partial'
+    for leftover in (partial, partial + '-wal', partial + '-shm'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'generate-dataset', '--reset',
+         '--reviews', str(SCALES[scale]), '--seed', str(seed), '--workers', str(workers)],
+        cwd=BACKEND_DIR, env=_env(partial, warm_cache=True), check=True
+    )
+    # Fold the WAL back into the file so the rename does not leave it behind
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        conn.close()
+    os.replace(partial, path)
+    return path
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    scales = args.scales.split(',')
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        raise SystemExit(f"Unknown scales: {', '.join(unknown)} (choose from {', '.join(SCALES)})")
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'mode': args.mode,
+            'concurrency': args.concurrency if args.mode == 'http' else 1,
+            'iterations': args.iterations,
+            'warm_cache': args.warm_cache,
+            'seed': args.seed
+        },
+        'scales': {}
+    }
+    for scale in scales:
+        dataset = ensure_dataset(scale, args.data_dir, args.seed, args.workers)
+        with tempfile.TemporaryDirectory() as scratch:
+            # Scenarios write reviews, so every run starts from a fresh copy
+            database = shutil.copy(dataset, os.path.join(scratch, 'bench.db'))
+            output = os.path.join(scratch, 'result.json')
+            print(f'Benchmarking {scale} ({args.mode} mode)...', file=sys.stderr)
+            command = [
+                sys.executable, '-m', 'benchmarks.runner', '--output', output, '--mode', args.mode,
+                '--concurrency', str(args.concurrency), '--iterations', str(args.iterations),
+                '--warmup', str(args.warmup)
+            ]
+            if args.only:
+                command += ['--only', args.only]
+            subprocess.run(command, cwd=BACKEND_DIR, env=_env(database, args.warm_cache), check=True)
+            with open(output) as f:
+                report['scales'][scale] = json.load(f)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f'Wrote {args.output}', file=sys.stderr)
+
+
+def writes(args):
+    from benchmarks.writes import run_phase
+
+    dataset = ensure_dataset(args.scale, args.data_dir, args.seed, args.workers)
+    phases = {'before': {'SQLITE_TUNING': '0'}, 'after': {'SQLITE_TUNING': '1'}}
+    report = {}
+    for phase, overrides in phases.items():
+        with tempfile.TemporaryDirectory() as scratch:
+            database = shutil.copy(dataset, os.path.join(scratch, 'bench.db'))
+            if overrides['SQLITE_TUNING'] == '0':
+                # WAL is stored in the file, so put the copy back in rollback-journal mode
+                with sqlite3.connect(database) as conn:
+                    conn.execute('PRAGMA journal_mode=DELETE')
+            saved = dict(os.environ)
+            os.environ.update(_env(database, warm_cache=True), **overrides)
+            try:
+                print(f'Running {phase}: {args.writers} writers, {args.readers} readers, {args.seconds}s...',
+                      file=sys.stderr)
+                report[phase] = run_phase(args.writers, args.readers, args.seconds)
+            finally:
+                os.environ.clear()
+                os.environ.update(saved)
+
+    for phase, summary in report.items():
+        for role, stats in summary.items():
+            print(f"{phase:<7} {role:<8} {stats['ok_per_sec']:>8.1f} ok/s  p50 {stats['p50_ms']:>8.2f} ms"
+                  f"  p95 {stats['p95_ms']:>8.2f} ms  locked {stats['locked_errors']}  errors {stats['other_errors']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+
+def compare_reports(baseline, current, metric='p95_ms', threshold=0.25, min_delta_ms=2.0):
+    """Per-scenario comparison rows for scenarios present in both reports.
+
+    Each row is (scale, scenario, baseline, current, relative change,
+    baseline queries, current queries, regressed).
+
+    Latency regresses when it grows by more than threshold (a fraction) and
+    by more than min_delta_ms. Any rise in the mean SQL statement count also
+    counts as a regression, since that does not depend on the machine.
+    """
+    rows = []
+    for scale, result in current['scales'].items():
+        base_scenarios = baseline['scales'].get(scale, {}).get('scenarios', {})
+        for name, stats in result['scenarios'].items():
+            base = base_scenarios.get(name)
+            if base is None:
+                continue
+            old, new = base[metric], stats[metric]
+            change = (new - old) / old if old else 0.0
+            regressed = change > threshold and new - old > min_delta_ms
+            old_queries, new_queries = base.get('queries_mean'), stats.get('queries_mean')
+            if old_queries is not None and new_queries is not None and new_queries > old_queries + 0.5:
+                regressed = True
+            rows.append((scale, name, old, new, change, old_queries, new_queries, regressed))
+    return rows
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+
+    for key in ('mode', 'concurrency', 'warm_cache'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)}); "
+                  'latencies are not comparable', file=sys.stderr)
+    rows = compare_reports(baseline, current, args.metric, args.threshold, args.min_delta_ms)
+    print(f"{'scale':<6} {'scenario':<38} {'baseline':>10} {'current':>10} {'change':>8}  queries")
+    for scale, name, old, new, change, old_queries, new_queries, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f'{scale:<6} {name:<38} {old:>10.2f} {new:>10.2f} {change:>+8.0%}  '
+              f'{old_queries} -> {new_queries}{flag}')
+    regressions = sum(1 for row in rows if row[-1])
+    if regressions:
+        raise SystemExit(f'{regressions} scenarios regressed against {args.baseline}')
+    print(f'No regressions ({args.metric}, threshold {args.threshold:.0%}).')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Benchmark the API at one or more dataset scales.')
+    run_parser.add_argument('--scales', default='10k,100k', help=f"Comma-separated, from {', '.join(SCALES)}.")
+    run_parser.add_argument('--mode', choices=('client', 'http'), default='client',
+                            help='Flask test client, or a local HTTP server under concurrent load.')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='Client threads in http mode.')
+    run_parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario.')
+    run_parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per scenario.')
+    run_parser.add_argument('--only', help='Comma-separated scenario names to run.')
+    run_parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep the analytics response cache on (it is disabled by default).')
+    run_parser.add_argument('--seed', type=int, default=42, help='Dataset seed.')
+    run_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used when a dataset has to be generated.')
+    run_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Where generated datasets are kept.')
+    run_parser.add_argument('--output', default='benchmark-results.json')
+    run_parser.set_defaults(func=run)
+
+    writes_parser = commands.add_parser(
+        'writes', help='Concurrent write/read throughput on SQLite with and without tuning.'
+    )
+    writes_parser.add_argument('--scale', default='10k', choices=list(SCALES))
+    writes_parser.add_argument('--writers', type=int, default=4, help='Processes posting reviews.')
+    writes_parser.add_argument('--readers', type=int, default=2, help='Processes listing reviews.')
+    writes_parser.add_argument('--seconds', type=float, default=10, help='Duration of each phase.')
+    writes_parser.add_argument('--seed', type=int, default=42, help='Dataset seed.')
+    writes_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                               help='Processes used when a dataset has to be generated.')
+    writes_parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Where generated datasets are kept.')
+    writes_parser.add_argument('--output', help='Also write the results as JSON.')
+    writes_parser.set_defaults(func=writes)
+
+    compare_parser = commands.add_parser('compare', help='Flag regressions against a baseline report.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('results')
+    compare_parser.add_argument('--metric', default='p95_ms', choices=('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'))
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='Allowed relative slowdown before a scenario is flagged.')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                                help='Ignore slowdowns smaller than this many milliseconds.')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
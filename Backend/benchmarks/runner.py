@@ -0,0 +1,208 @@
+"""
+Benchmark scenarios for one dataset, run inside this process.
+
+Started by ``python -m benchmarks run`` with DATABASE_URL pointing at a
+scratch copy of the dataset, since create_review and login write to it.
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from time import perf_counter
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+
+from app import app, db, Review, User, encode_review_cursor, scope_claims
+from benchmarks import percentile
+from seed_reviews import DATASET_PASSWORD
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PER_PAGE = 20
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+Scenario = namedtuple('Scenario', 'name method path body token')
+
+
+def build_scenarios():
+    """The endpoints under test, parameterized from what is in the dataset"""
+    admin = User.query.filter_by(role='admin').order_by(User.id).first()
+    hot_branch_id, hot_count = db.session.query(Review.branch_id, db.func.count(Review.id)).group_by(
+        Review.branch_id
+    ).order_by(db.func.count(Review.id).desc()).first()
+    manager = User.query.filter_by(role='manager', branch_id=hot_branch_id).first()
+    admin_token = create_access_token(identity=str(admin.id), additional_claims=scope_claims(admin))
+    manager_token = create_access_token(identity=str(manager.id), additional_claims=scope_claims(manager))
+
+    # Halfway down the full list, by OFFSET and by the matching keyset cursor
+    total = db.session.query(db.func.count(Review.id)).scalar()
+    deep_page = max(total // PER_PAGE // 2, 1)
+    last_before_page = Review.query.order_by(Review.created_at.desc(), Review.id.desc()).offset(
+        (deep_page - 1) * PER_PAGE - 1
+    ).first() if deep_page > 1 else None
+    cursor = encode_review_cursor(last_before_page) if last_before_page else ''
+
+    reviews = f'/api/reviews?per_page={PER_PAGE}'
+    new_review = {
+        'branch_id': hot_branch_id,
+        'rating': 2,
+        'title': 'Benchmark review',
+        'content': 'Service was a bit slow during peak hours.',
+        'source': 'google',
+        'category': 'service'
+    }
+    return [
+        Scenario('reviews.first_page', 'GET', reviews, None, admin_token),
+        Scenario('reviews.branch_sentiment', 'GET', f'{reviews}&branch_id={hot_branch_id}&sentiment=negative',
+                 None, admin_token),
+        Scenario('reviews.branch_category_source', 'GET',
+                 f'{reviews}&branch_id={hot_branch_id}&category=food&source=google', None, admin_token),
+        Scenario('reviews.deep_offset', 'GET', f'{reviews}&page={deep_page}', None, admin_token),
+        Scenario('reviews.deep_cursor', 'GET', f'{reviews}&cursor={cursor}', None, admin_token),
+        Scenario('reviews.manager_scope', 'GET', reviews, None, manager_token),
+        Scenario('analytics.dashboard', 'GET', '/api/analytics/dashboard', None, admin_token),
+        Scenario('branches.with_stats', 'GET', '/api/branches?with_stats=1', None, admin_token),
+        Scenario('analytics.trends_30d', 'GET', '/api/analytics/trends?days=30', None, admin_token),
+        Scenario('analytics.trends_365d_month_source', 'GET',
+                 '/api/analytics/trends?days=365&granularity=month&breakdown=source', None, admin_token),
+        Scenario('analytics.staff_30d', 'GET', '/api/analytics/staff?days=30', None, admin_token),
+        Scenario('reviews.create', 'POST', '/api/reviews', new_review, None),
+        Scenario('auth.login', 'POST', '/api/auth/login',
+                 {'email': manager.email, 'password': DATASET_PASSWORD}, None),
+    ], {'reviews': total, 'hot_branch_reviews': hot_count, 'deep_page': deep_page}
+
+
+def _headers(scenario):
+    headers = {'Content-Type': 'application/json'}
+    if scenario.token:
+        headers['Authorization'] = f'Bearer {scenario.token}'
+    return headers
+
+
+def _queries(server_timing):
+    match = SERVER_TIMING_QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class TestClientDriver:
+    """Calls the app in-process through the Flask test client, one request at a time"""
+
+    concurrency = 1
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def __call__(self, scenario):
+        started = perf_counter()
+        response = self.client.open(scenario.path, method=scenario.method, json=scenario.body,
+                                    headers=_headers(scenario))
+        response.get_data()
+        return response.status_code, perf_counter() - started, _queries(response.headers.get('Server-Timing'))
+
+    def close(self):
+        pass
+
+
+class HTTPDriver:
+    """Serves the app on a local threaded HTTP server and calls it from a pool of client threads"""
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __call__(self, scenario):
+        body = json.dumps(scenario.body) if scenario.body is not None else None
+        started = perf_counter()
+        conn = HTTPConnection('127.0.0.1', self.server.server_port, timeout=120)
+        try:
+            conn.request(scenario.method, scenario.path, body=body, headers=_headers(scenario))
+            response = conn.getresponse()
+            response.read()
+        finally:
+            conn.close()
+        return response.status, perf_counter() - started, _queries(response.getheader('Server-Timing'))
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_scenario(driver, scenario, iterations, warmup):
+    for _ in range(warmup):
+        driver(scenario)
+
+    started = perf_counter()
+    if driver.concurrency > 1:
+        with ThreadPoolExecutor(driver.concurrency) as pool:
+            samples = list(pool.map(lambda _: driver(scenario), range(iterations)))
+    else:
+        samples = [driver(scenario) for _ in range(iterations)]
+    elapsed = perf_counter() - started
+
+    latencies = sorted(sample[1] * 1000 for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[0] >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help='Comma-separated scenario names to run.')
+    parser.add_argument('--output', required=True, help='Where to write the JSON result.')
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        scenarios, dataset = build_scenarios()
+        db.session.remove()
+    if args.only:
+        wanted = set(args.only.split(','))
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    driver = HTTPDriver(args.concurrency) if args.mode == 'http' else TestClientDriver()
+    results = {}
+    try:
+        for scenario in scenarios:
+            result = results[scenario.name] = run_scenario(driver, scenario, args.iterations, args.warmup)
+            print(f"  {scenario.name:<38} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms"
+                  f"  queries {result['queries_mean']}", file=sys.stderr, flush=True)
+    finally:
+        driver.close()
+
+    with open(args.output, 'w') as f:
+        json.dump({'dataset': dataset, 'peak_rss_mb': peak_rss_mb(), 'scenarios': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Concurrent write throughput against one SQLite file.
+
+Writer processes post reviews and reader processes page through the review
+list at the same time, like gunicorn workers sharing a database. Every
+process imports the app after the parent has set its environment, so each
+phase runs with its own SQLite settings.
+"""
+import multiprocessing
+import time
+from time import perf_counter
+
+from benchmarks import percentile
+
+NEW_REVIEW = {
+    'branch_id': None,
+    'rating': 4,
+    'title': 'Benchmark review',
+    'content': 'Staff were attentive and friendly throughout.',
+    'source': 'internal',
+    'category': 'service'
+}
+
+
+def _worker(role, seconds, start_at, results):
+    from flask_jwt_extended import create_access_token
+    from app import app, db, Branch, User, scope_claims
+
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').order_by(User.id).first()
+        token = create_access_token(identity=str(admin.id), additional_claims=scope_claims(admin))
+        branch_id = db.session.query(db.func.min(Branch.id)).scalar()
+        db.session.remove()
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    body = dict(NEW_REVIEW, branch_id=branch_id)
+
+    ok = locked = failed = 0
+    latencies = []
+    time.sleep(max(start_at - time.time(), 0))
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        started = perf_counter()
+        if role == 'writer':
+            response = client.post('/api/reviews', json=body)
+        else:
+            response = client.get('/api/reviews?per_page=20&with_total=1', headers=headers)
+        latencies.append((perf_counter() - started) * 1000)
+        if response.status_code < 400:
+            ok += 1
+        elif 'locked' in (response.get_json(silent=True) or {}).get('message', ''):
+            locked += 1
+        else:
+            failed += 1
+    results.put({'role': role, 'ok': ok, 'locked': locked, 'failed': failed, 'latencies': latencies})
+
+
+def run_phase(writers, readers, seconds):
+    """Run writers and readers for seconds against DATABASE_URL; returns summary stats"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    # Leave time for every process to import the app before the clock starts
+    start_at = time.time() + 5
+    processes = [
+        context.Process(target=_worker, args=(role, seconds, start_at, results))
+        for role in ['writer'] * writers + ['reader'] * readers
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for role in ('writer', 'reader'):
+        group = [s for s in samples if s['role'] == role]
+        if not group:
+            continue
+        latencies = sorted(ms for s in group for ms in s['latencies'])
+        summary[f'{role}s'] = {
+            'processes': len(group),
+            'ok_per_sec': round(sum(s['ok'] for s in group) / seconds, 1),
+            'locked_errors': sum(s['locked'] for s in group),
+            'other_errors': sum(s['failed'] for s in group),
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else None
+        }
+    return summary
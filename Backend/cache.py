@@ -0,0 +1,164 @@
+"""
+Caches used by the API handlers.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after being set"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalCacheBackend:
+    """Per-process storage for VersionedCache"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl):
+        self.entries.set(key, value, ttl)
+
+    def get_versions(self, names):
+        return [self.versions.get(name, 0) for name in names]
+
+    def bump(self, names):
+        with self._lock:
+            for name in names:
+                self.versions[name] = self.versions.get(name, 0) + 1
+
+
+class RedisCacheBackend:
+    """Storage for VersionedCache shared by every worker through Redis.
+
+    Requires the optional ``redis`` package.
+    """
+
+    def __init__(self, url, prefix='review-app:cache:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('The redis package is required for a redis:// cache URL') from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, int(ttl), json.dumps(value))
+
+    def get_versions(self, names):
+        if not names:
+            return []
+        values = self.client.mget([f'{self.prefix}v:{name}' for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, names):
+        pipe = self.client.pipeline()
+        for name in names:
+            pipe.incr(f'{self.prefix}v:{name}')
+        pipe.execute()
+
+
+class VersionedCache:
+    """Cache for computed responses that depend on a set of scopes (e.g. branches).
+
+    Every key embeds the current version of each scope it depends on, so
+    bumping a scope makes all entries computed from it unreachable at once;
+    they then age out through the backend's TTL/LRU.
+    """
+
+    def __init__(self, backend, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key(self, namespace, scopes, params):
+        scopes = sorted(set(scopes))
+        versions = self.backend.get_versions(scopes)
+        raw = json.dumps([params, list(zip(scopes, versions))], sort_keys=True, default=str)
+        return f'{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def get_or_compute(self, namespace, scopes, params, compute):
+        """Return (value, hit) for the entry, computing and storing it on a miss"""
+        key = self._key(namespace, scopes, params)
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value, self.ttl)
+        return value, False
+
+    def invalidate(self, scopes):
+        scopes = sorted(set(scopes))
+        if scopes:
+            self.backend.bump(scopes)
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,85 @@
+"""
+Engine settings for the application database.
+
+SQLite is tuned for several web workers sharing one file: WAL lets readers
+carry on while a writer commits, ``synchronous=NORMAL`` is durable enough
+under WAL without an fsync per commit, and ``busy_timeout`` makes a writer
+wait for the lock instead of failing with "database is locked". The pragmas
+are applied to every new DBAPI connection.
+
+Server databases (PostgreSQL) get a tunable connection pool instead.
+Connections must never be shared between processes, so pooled connections
+inherited through ``fork()`` (e.g. ``gunicorn --preload``) are dropped in
+the child without closing them on the parent's behalf.
+
+``RoutingSession`` lets a request send its reads to a replica bind while
+every flush and INSERT/UPDATE/DELETE still goes to the primary.
+"""
+import os
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64000,  # negative means KiB, i.e. ~64 MB per connection
+}
+
+
+def pool_options(uri, size=5, max_overflow=10, pre_ping=True, recycle=1800, timeout=30):
+    """SQLALCHEMY_ENGINE_OPTIONS for uri; SQLite keeps SQLAlchemy's defaults"""
+    if uri.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': size,
+        'max_overflow': max_overflow,
+        'pool_pre_ping': pre_ping,
+        'pool_recycle': recycle,
+        'pool_timeout': timeout,
+    }
+
+
+def _set_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def configure_engines(engines, sqlite_pragmas=DEFAULT_SQLITE_PRAGMAS):
+    """Install the SQLite pragmas and the fork handler on engines"""
+    engines = list(engines)
+    for engine in engines:
+        if engine.dialect.name == 'sqlite' and sqlite_pragmas:
+            event.listen(engine, 'connect', _set_sqlite_pragmas(dict(sqlite_pragmas)))
+
+    def dispose_in_child():
+        for engine in engines:
+            engine.dispose(close=False)
+
+    # Not available on Windows, which has no fork()
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=dispose_in_child)
+
+
+class RoutingSession(Session):
+    """Session that reads from the bind named in ``info['read_bind']`` when one is set.
+
+    Flushes and DML statements always use the models' own bind (the
+    primary). The session is scoped to the app context, so the routing
+    lasts until the end of the request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        read_bind = self.info.get('read_bind')
+        if read_bind and bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            return self._db.engines[read_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
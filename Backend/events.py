@@ -0,0 +1,228 @@
+"""
+Live review events for Server-Sent Events subscribers.
+
+Handlers record events while they change reviews; once the transaction
+commits, an ``EventBackend`` carries them to the ``EventBus`` of every web
+worker, which fans them out to that worker's open streams. Each subscriber
+has a bounded buffer: a client that cannot keep up is cut off with an
+overflow flag and is expected to refetch instead of replaying the backlog.
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class BusFull(Exception):
+    """The worker already serves its maximum number of streams"""
+
+
+class EventBackend:
+    """Carries committed events from the publishing worker to every worker.
+
+    ``transactional`` backends have ``publish`` called inside the request
+    transaction, so events are stored together with the change that produced
+    them; the others are called after it commits.
+    """
+
+    transactional = False
+
+    def publish(self, events):
+        raise NotImplementedError
+
+    def start(self, deliver):
+        """Begin passing events from other workers to ``deliver(events)``"""
+        raise NotImplementedError
+
+
+class LocalEventBackend(EventBackend):
+    """Delivers events to this process only (single worker, development)"""
+
+    def __init__(self):
+        self.deliver = None
+        self.ids = itertools.count(1)
+
+    def publish(self, events):
+        if self.deliver is None:
+            return
+        self.deliver([dict(event, id=next(self.ids)) for event in events])
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+
+class DatabaseEventBackend(EventBackend):
+    """Events stored as rows of ``model`` and polled by every worker.
+
+    Rows are written in the transaction that produced them, and row ids
+    double as SSE event ids. Ids are assigned at insert but become visible at
+    commit, so a lower id can appear after a higher one (PostgreSQL
+    sequences). Ids skipped by a poll are looked for again for ``gap_timeout``
+    seconds before they are given up as rolled back. ``prune`` deletes rows
+    older than ``retention`` seconds and is run by ``flask worker``, so it
+    does not depend on any stream being open.
+    """
+
+    transactional = True
+
+    def __init__(self, db, model, poll_interval=1.0, retention=3600, batch_size=500, gap_timeout=30):
+        self.db = db
+        self.model = model
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.last_id = None
+        # Skipped id -> when it was first missed
+        self.gaps = {}
+
+    def publish(self, events):
+        now = datetime.utcnow()
+        self.db.session.execute(self.model.__table__.insert(), [
+            {'kind': event['type'], 'branch_id': event['branch_id'], 'payload': event['data'], 'created_at': now}
+            for event in events
+        ])
+
+    def start(self, deliver):
+        # Needs the app context of the request that opened the first stream
+        engine = self.db.engine
+        thread = threading.Thread(target=self._poll, args=(engine, deliver), name='event-poller', daemon=True)
+        thread.start()
+
+    def prune(self):
+        """Delete events older than ``retention`` seconds; returns the number deleted"""
+        table = self.model.__table__
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+        with self.db.engine.begin() as conn:
+            return conn.execute(table.delete().where(table.c.created_at < cutoff)).rowcount
+
+    def poll_once(self, conn):
+        """Events committed since the previous call, including late commits of skipped ids"""
+        table = self.model.__table__
+        if self.last_id is None:
+            self.last_id = conn.execute(self.db.select(self.db.func.max(table.c.id))).scalar() or 0
+            return []
+        condition = table.c.id > self.last_id
+        if self.gaps:
+            condition = self.db.or_(condition, table.c.id.in_(sorted(self.gaps)))
+        rows = conn.execute(
+            self.db.select(table.c.id, table.c.kind, table.c.branch_id, table.c.payload)
+            .where(condition)
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+        ).all()
+        now = time.monotonic()
+        for row in rows:
+            self.gaps.pop(row.id, None)
+            if row.id > self.last_id:
+                for missing in range(self.last_id + 1, min(row.id, self.last_id + 1 + self.batch_size)):
+                    self.gaps.setdefault(missing, now)
+                self.last_id = row.id
+        for missing, since in list(self.gaps.items()):
+            if now - since > self.gap_timeout:
+                del self.gaps[missing]
+        return [
+            {'id': row.id, 'type': row.kind, 'branch_id': row.branch_id, 'data': row.payload}
+            for row in rows
+        ]
+
+    def _poll(self, engine, deliver):
+        with engine.connect() as conn:
+            self.poll_once(conn)
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                with engine.connect() as conn:
+                    events = self.poll_once(conn)
+            except Exception:
+                logger.exception('Polling events failed')
+                continue
+            if events:
+                deliver(events)
+
+
+class Subscription:
+    """One open stream: a bounded buffer of events that pass ``accepts``"""
+
+    def __init__(self, accepts, max_pending):
+        self.accepts = accepts
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.overflowed = False
+        self.condition = threading.Condition()
+
+    def push(self, events):
+        events = [event for event in events if self.accepts(event)]
+        if not events:
+            return
+        with self.condition:
+            self.pending.extend(events)
+            if len(self.pending) > self.max_pending:
+                # Too far behind to catch up; the client refetches instead
+                self.pending.clear()
+                self.overflowed = True
+            self.condition.notify()
+
+    def wait(self, timeout):
+        """Events received since the last call, or [] if none arrived within timeout"""
+        with self.condition:
+            if not self.pending and not self.overflowed:
+                self.condition.wait(timeout)
+            events = list(self.pending)
+            self.pending.clear()
+            return events
+
+
+class EventBus:
+    """Fans events out to the subscriptions open in this worker.
+
+    The last ``history`` events are kept so a reconnecting client can resume
+    from its ``Last-Event-ID``; older gaps are reported as missed.
+    """
+
+    def __init__(self, backend, max_subscribers=100, max_pending=100, history=1000):
+        self.backend = backend
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self.history = deque(maxlen=history)
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+        self.started = False
+
+    def publish(self, events):
+        """Hand events to the backend; see EventBackend.transactional for when to call this"""
+        if events:
+            self.backend.publish(events)
+
+    def deliver(self, events):
+        with self.lock:
+            self.history.extend(events)
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.push(events)
+
+    def subscribe(self, accepts, last_event_id=None):
+        """Open a subscription; returns (subscription, missed_events_flag)"""
+        with self.lock:
+            if len(self.subscriptions) >= self.max_subscribers:
+                raise BusFull()
+            if not self.started:
+                self.backend.start(self.deliver)
+                self.started = True
+            subscription = Subscription(accepts, self.max_pending)
+            missed = False
+            if last_event_id is not None:
+                replay = [event for event in self.history if event['id'] > last_event_id]
+                oldest = self.history[0]['id'] if self.history else None
+                missed = oldest is None or oldest > last_event_id + 1
+                subscription.push(replay)
+            self.subscriptions.add(subscription)
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
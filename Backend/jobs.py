@@ -0,0 +1,200 @@
+"""
+Background job subsystem.
+
+Work that does not have to finish inside a request is recorded as a job and
+executed later by ``flask worker``. Handlers are registered per job kind and
+receive every payload claimed for one coalesce key in a single call, so a
+burst of events for the same branch is processed once.
+"""
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class JobBackend:
+    """Where jobs are stored between enqueue and execution.
+
+    ``enqueue`` is called inside the request transaction. Backends that cannot
+    take part in that transaction should buffer jobs until it commits.
+    """
+
+    def enqueue(self, kind, payload, coalesce_key=None):
+        raise NotImplementedError
+
+    def claim(self, limit):
+        """Lock up to ``limit`` due jobs for this worker and return them"""
+        raise NotImplementedError
+
+    def complete(self, jobs):
+        raise NotImplementedError
+
+    def retry(self, jobs, error, run_at):
+        raise NotImplementedError
+
+    def fail(self, jobs, error):
+        raise NotImplementedError
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class DatabaseJobBackend(JobBackend):
+    """Jobs stored as rows of ``model`` in the application database.
+
+    Enqueued rows are committed together with the change that produced them.
+    Claimed jobs whose worker died are picked up again after
+    ``visibility_timeout`` seconds.
+    """
+
+    def __init__(self, db, model, visibility_timeout=300):
+        self.db = db
+        self.model = model
+        self.visibility_timeout = visibility_timeout
+
+    def enqueue(self, kind, payload, coalesce_key=None):
+        now = datetime.utcnow()
+        self.db.session.add(self.model(
+            kind=kind,
+            payload=payload,
+            coalesce_key=coalesce_key,
+            status='pending',
+            attempts=0,
+            run_at=now,
+            created_at=now
+        ))
+
+    def claim(self, limit):
+        Job = self.model
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.visibility_timeout)
+        jobs = Job.query.filter(self.db.or_(
+            self.db.and_(Job.status == 'pending', Job.run_at <= now),
+            self.db.and_(Job.status == 'running', Job.locked_at < stale)
+        )).order_by(Job.id).limit(limit).with_for_update(skip_locked=True).all()
+        for job in jobs:
+            job.status = 'running'
+            job.locked_at = now
+        self.db.session.commit()
+        return jobs
+
+    def complete(self, jobs):
+        ids = [job.id for job in jobs]
+        self.model.query.filter(self.model.id.in_(ids)).delete(synchronize_session=False)
+
+    def retry(self, jobs, error, run_at):
+        for job in jobs:
+            job.status = 'pending'
+            job.attempts += 1
+            job.last_error = error
+            job.run_at = run_at
+            job.locked_at = None
+
+    def fail(self, jobs, error):
+        for job in jobs:
+            job.status = 'failed'
+            job.attempts += 1
+            job.last_error = error
+            job.locked_at = None
+
+    def commit(self):
+        self.db.session.commit()
+
+    def rollback(self):
+        self.db.session.rollback()
+
+
+class InlineJobBackend(JobBackend):
+    """Runs each job immediately inside the caller's transaction (development and scripts)"""
+
+    def __init__(self):
+        self.queue = None
+
+    def enqueue(self, kind, payload, coalesce_key=None):
+        self.queue.handlers[kind]([payload])
+
+
+class JobQueue:
+    def __init__(self, backend, max_attempts=5, retry_base=2.0, retry_max=300.0):
+        self.backend = backend
+        self.handlers = {}
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.periodic = []
+        if isinstance(backend, InlineJobBackend):
+            backend.queue = self
+
+    def handler(self, kind):
+        """Register ``func(payloads)`` as the handler for jobs of ``kind``"""
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+        return decorator
+
+    def every(self, seconds, func):
+        """Have ``work()`` call ``func()`` at most once every ``seconds`` (housekeeping)"""
+        self.periodic.append([seconds, func, None])
+
+    def run_periodic(self):
+        now = time.monotonic()
+        for task in self.periodic:
+            seconds, func, last_run = task
+            if last_run is not None and now - last_run < seconds:
+                continue
+            task[2] = now
+            try:
+                func()
+            except Exception:
+                logger.exception('Periodic task %s failed', func.__name__)
+
+    def enqueue(self, kind, payload, coalesce_key=None):
+        if kind not in self.handlers:
+            raise KeyError(f'No handler registered for job kind {kind!r}')
+        self.backend.enqueue(kind, payload, coalesce_key)
+
+    def retry_delay(self, attempts):
+        """Exponential backoff with jitter for a job that has failed ``attempts`` times"""
+        delay = min(self.retry_base * 2 ** max(attempts - 1, 0), self.retry_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_batch(self, limit=100):
+        """Claim and run one batch of due jobs; returns the number of jobs processed"""
+        jobs = self.backend.claim(limit)
+        groups = {}
+        for job in jobs:
+            groups.setdefault((job.kind, job.coalesce_key or f'job:{job.id}'), []).append(job)
+
+        for (kind, _), group in groups.items():
+            try:
+                self.handlers[kind]([job.payload for job in group])
+                self.backend.complete(group)
+                self.backend.commit()
+            except Exception as e:
+                self.backend.rollback()
+                error = f'{type(e).__name__}: {e}'
+                attempts = max(job.attempts for job in group) + 1
+                if attempts >= self.max_attempts:
+                    logger.error('Job %s failed permanently after %d attempts: %s', kind, attempts, error)
+                    self.backend.fail(group, error)
+                else:
+                    run_at = datetime.utcnow() + timedelta(seconds=self.retry_delay(attempts))
+                    logger.warning('Job %s failed (attempt %d), retrying at %s: %s', kind, attempts, run_at, error)
+                    self.backend.retry(group, error, run_at)
+                self.backend.commit()
+        return len(jobs)
+
+    def work(self, batch_size=100, poll_interval=1.0, once=False):
+        """Process jobs until interrupted, or until the queue is drained when ``once`` is set"""
+        while True:
+            self.run_periodic()
+            processed = self.run_batch(batch_size)
+            if not processed:
+                if once:
+                    return
+                time.sleep(poll_interval)
@@ -0,0 +1,41 @@
+"""Analytics delta counters
+
+Adds the raw counters that per-event deltas are applied to and a unique
+(branch_id, date) key so rollup rows can be upserted.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('analytics') as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('responded_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_unique_constraint('uq_analytics_branch_date', ['branch_id', 'date'])
+
+    # Derive the counters for rows written by the old recompute path; run
+    # `flask analytics-backfill` afterwards for exact values
+    op.execute(
+        "UPDATE analytics SET "
+        "rating_sum = CAST(ROUND(COALESCE(avg_rating, 0) * COALESCE(total_reviews, 0)) AS INTEGER), "
+        "responded_count = CAST(ROUND(COALESCE(response_rate, 0) * COALESCE(total_reviews, 0) / 100.0) AS INTEGER)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('analytics') as batch_op:
+        batch_op.drop_constraint('uq_analytics_branch_date', type_='unique')
+        batch_op.drop_column('responded_count')
+        batch_op.drop_column('rating_sum')
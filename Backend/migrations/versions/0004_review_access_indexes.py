@@ -0,0 +1,38 @@
+"""Composite indexes for the review access patterns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+REVIEW_INDEXES = (
+    ('ix_reviews_created_at_id', ['created_at', 'id']),
+    ('ix_reviews_branch_created', ['branch_id', 'created_at', 'id']),
+    ('ix_reviews_branch_sentiment_created', ['branch_id', 'sentiment', 'created_at']),
+    ('ix_reviews_branch_category_created', ['branch_id', 'category', 'created_at']),
+    ('ix_reviews_branch_source_created', ['branch_id', 'source', 'created_at']),
+    ('ix_reviews_sentiment_created', ['sentiment', 'created_at']),
+)
+
+
+def upgrade():
+    for name, columns in REVIEW_INDEXES:
+        op.create_index(name, 'reviews', columns, unique=False)
+    op.create_index(op.f('ix_branches_manager_id'), 'branches', ['manager_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_branches_manager_id'), table_name='branches')
+    for name, _ in reversed(REVIEW_INDEXES):
+        op.drop_index(name, table_name='reviews')
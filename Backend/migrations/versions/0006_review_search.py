@@ -0,0 +1,63 @@
+"""Full-text search over review title and content
+
+SQLite: external-content FTS5 table kept in sync by triggers.
+PostgreSQL: generated tsvector column with a GIN index.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    "title, content, content='reviews', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN "
+    "INSERT INTO reviews_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF title, content ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO reviews_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    # Index the reviews that already exist
+    "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS reviews_fts_au",
+    "DROP TRIGGER IF EXISTS reviews_fts_ad",
+    "DROP TRIGGER IF EXISTS reviews_fts_ai",
+    "DROP TABLE IF EXISTS reviews_fts",
+)
+POSTGRES_UPGRADE = (
+    "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_vector ON reviews USING GIN (search_vector)",
+)
+POSTGRES_DOWNGRADE = (
+    "DROP INDEX IF EXISTS ix_reviews_search_vector",
+    "ALTER TABLE reviews DROP COLUMN IF EXISTS search_vector",
+)
+
+
+def _run(statements_by_dialect):
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, ()):
+        op.execute(statement)
+
+
+def upgrade():
+    _run({'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRES_UPGRADE})
+
+
+def downgrade():
+    _run({'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRES_DOWNGRADE})
@@ -0,0 +1,29 @@
+"""Branch version counter
+
+Adds the per-branch counter that is bumped whenever a branch's reviews or
+rollups change; read endpoints derive their ETags from it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('branches') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('branches') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,34 @@
+"""Partial covering indexes for the staff performance aggregates
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+STAFF_INDEXES = (
+    ('ix_reviews_branch_created_staff', ['branch_id', 'created_at', 'staff_id', 'rating'], 'staff_id IS NOT NULL'),
+    ('ix_reviews_branch_responded', ['branch_id', 'responded_at', 'responded_by', 'created_at'],
+     'responded_by IS NOT NULL'),
+)
+
+
+def upgrade():
+    for name, columns, where in STAFF_INDEXES:
+        op.create_index(name, 'reviews', columns, unique=False,
+                        sqlite_where=sa.text(where), postgresql_where=sa.text(where))
+
+
+def downgrade():
+    for name, _, _ in reversed(STAFF_INDEXES):
+        op.drop_index(name, table_name='reviews')
@@ -0,0 +1,30 @@
+"""Reply template updated_at
+
+Templates can now be edited; the list ETag and suggestion index key off
+the newest edit.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reply_templates', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE reply_templates SET updated_at = created_at')
+
+
+def downgrade():
+    with op.batch_alter_table('reply_templates', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,46 @@
+"""Branch review counters
+
+Adds all-time review counters to branches so branch summaries read one row
+per branch, and fills them from the existing reviews.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    'total_reviews': 'COUNT(*)',
+    'rating_sum': 'COALESCE(SUM(rating), 0)',
+    'positive_count': "COALESCE(SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END), 0)",
+    'neutral_count': "COALESCE(SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END), 0)",
+    'negative_count': "COALESCE(SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END), 0)",
+    'responded_count': 'COALESCE(SUM(CASE WHEN is_responded THEN 1 ELSE 0 END), 0)',
+    'escalated_count': 'COALESCE(SUM(CASE WHEN is_escalated THEN 1 ELSE 0 END), 0)',
+}
+
+
+def upgrade():
+    with op.batch_alter_table('branches') as batch_op:
+        for name in COUNTERS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+    assignments = ', '.join(
+        f'{name} = (SELECT {expr} FROM reviews WHERE reviews.branch_id = branches.id)'
+        for name, expr in COUNTERS.items()
+    )
+    op.execute(f'UPDATE branches SET {assignments}')
+
+
+def downgrade():
+    with op.batch_alter_table('branches') as batch_op:
+        for name in reversed(list(COUNTERS)):
+            batch_op.drop_column(name)
@@ -0,0 +1,110 @@
+"""
+Password hashing off the request thread.
+
+Hashing and verification are deliberately slow, so a burst of logins can
+pin every web worker on CPU while other API traffic queues behind it.
+``PasswordHasher`` runs them in a small process pool and admits only a
+bounded number of calls at a time. When that limit is reached it fails
+fast with ``HasherBusy``, which the API turns into a 429.
+
+The hash method is configurable. Hashes stored under other parameters still
+verify, and ``needs_rehash`` tells the caller to upgrade them after a
+successful login.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HasherBusy(Exception):
+    """Raised when more hashing calls are in flight than the hasher admits"""
+
+
+class PasswordHasher:
+    def __init__(self, method=DEFAULT_METHOD, workers=2, max_pending=16, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._prefix = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use in each process so forked web workers never share one
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Too many password operations in progress')
+        if self.workers < 1:
+            try:
+                return func(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot belongs to the task, not the caller: a timed-out hash keeps
+        # a pool worker busy until it finishes, so it must keep its slot too
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy('Timed out waiting for password hashing') from None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if pwhash was produced with different parameters than the current method"""
+        if self._prefix is None:
+            # Werkzeug expands defaults ('pbkdf2' -> 'pbkdf2:sha256:600000'), so ask it
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
+
+
+def benchmark(worker_counts=(1, 2, 4), logins=32, method=DEFAULT_METHOD):
+    """Verifications/sec for concurrent logins at each pool size; returns {workers: rate}"""
+    pwhash = generate_password_hash('password123', method)
+    results = {}
+    for workers in worker_counts:
+        hasher = PasswordHasher(method, workers=workers, max_pending=logins, timeout=None)
+        pool = hasher._pool()
+        # Warm the pool so process start-up is not counted
+        list(pool.map(check_password_hash, [pwhash] * workers, ['password123'] * workers))
+        threads = [threading.Thread(target=hasher.verify, args=(pwhash, 'password123')) for _ in range(logins)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results[workers] = logins / (time.perf_counter() - start)
+        hasher.shutdown()
+    return results
+
+
+if __name__ == '__main__':
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers, rate in benchmark(counts).items():
+        print(f'{workers:>3} workers: {rate:,.1f} logins/sec')
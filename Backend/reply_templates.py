@@ -0,0 +1,117 @@
+"""
+Reply template rendering and suggestions.
+
+Template text uses ``{placeholder}`` fields (``{{`` and ``}}`` for literal
+braces). Each distinct text is parsed once into literal and field parts, so
+rendering a template for many reviews is a join over precomputed pieces.
+
+``TemplateIndex`` keeps the active templates of one worker in memory, keyed
+by ``(category, sentiment_type)``, so suggesting replies for a review does
+not touch the templates table. Edits made by this worker reset it at once;
+edits made by other workers are picked up after ``ttl`` seconds.
+"""
+import re
+import threading
+import time
+from functools import lru_cache
+
+PLACEHOLDER_RE = re.compile(r'\{\{|\}\}|\{(\w+)\}')
+
+
+class CompiledTemplate:
+    """Template text split into literal strings and placeholder names"""
+
+    __slots__ = ('parts', 'fields')
+
+    def __init__(self, parts):
+        # Even positions are literals, odd positions are field names
+        self.parts = parts
+        self.fields = frozenset(parts[1::2])
+
+    def render(self, values):
+        """Fill the placeholders from values; unknown ones are left as written"""
+        pieces = list(self.parts)
+        for i in range(1, len(pieces), 2):
+            name = pieces[i]
+            value = values.get(name)
+            pieces[i] = f'{{{name}}}' if value is None else str(value)
+        return ''.join(pieces)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(text):
+    """Parse template text once; the cache is keyed by the text, so an edit never sees a stale parse"""
+    parts = []
+    literal = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(text):
+        literal.append(text[position:match.start()])
+        if match.group(1) is None:
+            literal.append(match.group(0)[0])
+        else:
+            parts.append(''.join(literal))
+            parts.append(match.group(1))
+            literal = []
+        position = match.end()
+    literal.append(text[position:])
+    parts.append(''.join(literal))
+    return CompiledTemplate(tuple(parts))
+
+
+def unknown_placeholders(text, allowed):
+    """Placeholder names in text that are not in allowed, in order of appearance"""
+    fields = compile_template(text).parts[1::2]
+    return [name for name in dict.fromkeys(fields) if name not in allowed]
+
+
+class TemplateIndex:
+    """Active templates by (category, sentiment_type), loaded lazily from ``load()``.
+
+    ``load`` returns the active templates as dicts with at least
+    ``template_text``, ``category`` and ``sentiment_type``. A template with no
+    category or sentiment matches any value.
+    """
+
+    def __init__(self, load, ttl=60):
+        self.load = load
+        self.ttl = ttl
+        self._index = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._generation += 1
+
+    def _current(self):
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._index
+            generation = self._generation
+        index = {}
+        for template in self.load():
+            entry = (template, compile_template(template['template_text']))
+            index.setdefault((template['category'], template['sentiment_type']), []).append(entry)
+        with self._lock:
+            # An edit committed while loading makes this copy stale already
+            if generation == self._generation:
+                self._index = index
+                self._loaded_at = time.monotonic()
+        return index
+
+    def suggest(self, category, sentiment, limit=3):
+        """(template, compiled) pairs for a review, most specific match first.
+
+        Exact (category, sentiment) matches come first, then templates for
+        the sentiment only, then for the category only, then generic ones.
+        """
+        index = self._current()
+        matches = []
+        keys = dict.fromkeys(((category, sentiment), (None, sentiment), (category, None), (None, None)))
+        for key in keys:
+            matches.extend(index.get(key, ()))
+            if len(matches) >= limit:
+                break
+        return matches[:limit]
@@ -1,7 +1,16 @@
+import math
 import random
+from bisect import bisect
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
 
-from app import app, db, User, Branch, Review
+from app import (
+    app, db, User, Branch, Review, Analytics, AnalyticsBreakdown, rebuild_analytics, analyze_sentiment,
+    count_branch_reviews, store_branch_counts, password_hasher, ANALYTICS_COUNTERS, SQLITE_FTS_DDL
+)
 
 
 def infer_sentiment_from_rating(rating: int) -> str:
@@ -12,70 +21,70 @@ def infer_sentiment_from_rating(rating: int) -> str:
     return "neutral"
 
 
-def generate_sample_text(rating: int, category: str) -> tuple[str, str]:
-    positive_phrases = [
-        "Amazing experience",
-        "Great service",
-        "Loved the ambience",
-        "Delicious food",
-        "Highly recommended",
-    ]
-    neutral_phrases = [
-        "Decent overall",
-        "Average experience",
-        "Nothing special",
-        "Okay visit",
-        "Could be better",
-    ]
-    negative_phrases = [
-        "Very disappointing",
-        "Poor service",
-        "Bad experience",
-        "Not satisfied",
-        "Would not recommend",
-    ]
+POSITIVE_PHRASES = [
+    "Amazing experience",
+    "Great service",
+    "Loved the ambience",
+    "Delicious food",
+    "Highly recommended",
+]
+NEUTRAL_PHRASES = [
+    "Decent overall",
+    "Average experience",
+    "Nothing special",
+    "Okay visit",
+    "Could be better",
+]
+NEGATIVE_PHRASES = [
+    "Very disappointing",
+    "Poor service",
+    "Bad experience",
+    "Not satisfied",
+    "Would not recommend",
+]
+CATEGORY_PHRASES = {
+    "food": [
+        "The dishes were flavorful and served hot.",
+        "Portions were generous and presentation was nice.",
+        "Food quality was inconsistent compared to previous visits.",
+        "Some items on the menu were unavailable.",
+    ],
+    "service": [
+        "Staff were attentive and friendly throughout.",
+        "Service was a bit slow during peak hours.",
+        "Requests were handled politely and efficiently.",
+        "It was difficult to get the staff's attention.",
+    ],
+    "staff": [
+        "The team was professional and courteous.",
+        "Staff seemed overwhelmed but tried their best.",
+        "Some staff members were not very welcoming.",
+        "The manager personally checked on our table.",
+    ],
+    "cleanliness": [
+        "The place was clean and well maintained.",
+        "Washrooms could be cleaned more frequently.",
+        "Tables were cleared quickly between customers.",
+        "Saw some trash left around the corner tables.",
+    ],
+    "ambience": [
+        "The music and lighting created a great vibe.",
+        "Ambience was okay but a bit too noisy.",
+        "Seating was comfortable and spacious.",
+        "The place felt a little cramped during rush hours.",
+    ],
+}
+
 
+def generate_sample_text(rating: int, category: str) -> tuple[str, str]:
     if rating >= 4:
-        title = random.choice(positive_phrases)
+        title = random.choice(POSITIVE_PHRASES)
     elif rating <= 2:
-        title = random.choice(negative_phrases)
+        title = random.choice(NEGATIVE_PHRASES)
     else:
-        title = random.choice(neutral_phrases)
-
-    category_phrases = {
-        "food": [
-            "The dishes were flavorful and served hot.",
-            "Portions were generous and presentation was nice.",
-            "Food quality was inconsistent compared to previous visits.",
-            "Some items on the menu were unavailable.",
-        ],
-        "service": [
-            "Staff were attentive and friendly throughout.",
-            "Service was a bit slow during peak hours.",
-            "Requests were handled politely and efficiently.",
-            "It was difficult to get the staff's attention.",
-        ],
-        "staff": [
-            "The team was professional and courteous.",
-            "Staff seemed overwhelmed but tried their best.",
-            "Some staff members were not very welcoming.",
-            "The manager personally checked on our table.",
-        ],
-        "cleanliness": [
-            "The place was clean and well maintained.",
-            "Washrooms could be cleaned more frequently.",
-            "Tables were cleared quickly between customers.",
-            "Saw some trash left around the corner tables.",
-        ],
-        "ambience": [
-            "The music and lighting created a great vibe.",
-            "Ambience was okay but a bit too noisy.",
-            "Seating was comfortable and spacious.",
-            "The place felt a little cramped during rush hours.",
-        ],
-    }
-
-    sentences = category_phrases.get(category, category_phrases["service"])
+        title = random.choice(NEUTRAL_PHRASES)
+
+    sentences = CATEGORY_PHRASES.get(category, CATEGORY_PHRASES["service"])
     content = f"{title}. {random.choice(sentences)}"
     return title, content
 
@@ -197,9 +206,320 @@ def seed_database(num_branches: int = 5, reviews_per_branch: int = 200) -> None:
                 db.session.add(review)
 
         db.session.commit()
+
+        # Seeded rows bypass the write path, so build their rollups in one pass
+        today = datetime.utcnow().date()
+        rebuild_analytics(today - timedelta(days=180), today)
+        store_branch_counts(count_branch_reviews())
+        db.session.commit()
         print("Database seeding complete.")
 
 
+# ============ LOAD-TEST DATASETS ============
+# Shapes loosely follow production: a few branches take most of the traffic,
+# weekends and occasional bursts (campaigns, viral posts) are busier, ratings
+# are J-shaped and Google dominates the source mix.
+
+SOURCE_WEIGHTS = {"google": 45, "zomato": 30, "internal": 15, "whatsapp": 10}
+CATEGORY_WEIGHTS = {"food": 35, "service": 25, "staff": 15, "cleanliness": 10, "ambience": 15}
+RATING_WEIGHTS = (13, 9, 13, 27, 38)  # 1 to 5 stars
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 1, 2, 3, 4, 4, 5, 7, 10, 11, 8, 5, 4, 5, 7, 10, 11, 9, 5, 2)
+RESPONSE_TEXTS = [
+    "Thank you for your feedback, we are glad you enjoyed your visit!",
+    "Thanks for letting us know. We have shared this with the branch team.",
+    "We are sorry about your experience and would like to make it right.",
+]
+DATASET_PASSWORD = "password123"
+# Position of each sentiment's counter in ANALYTICS_COUNTERS
+SENTIMENT_COUNTERS = {"positive": 2, "neutral": 3, "negative": 4}
+
+# Everything a worker needs to synthesize any chunk of the dataset
+DatasetPlan = namedtuple(
+    "DatasetPlan", "seed start days branch_ids branch_cum rating_cum day_cum staff managers"
+)
+
+
+def build_dataset_plan(seed, branches, days, end):
+    """Skewed branch/day/rating distributions for branches, a list of (id, manager_id, staff_ids)"""
+    rng = random.Random(seed)
+
+    # Zipf-like popularity over a shuffled branch order, so the hot branches
+    # are not always the lowest ids
+    order = list(range(len(branches)))
+    rng.shuffle(order)
+    popularity = [0.0] * len(branches)
+    for rank, index in enumerate(order):
+        popularity[index] = 1 / (rank + 1) ** 1.1
+
+    # Each branch gets a quality bias that tilts its rating distribution
+    rating_cum = []
+    for _ in branches:
+        bias = rng.uniform(-1, 1)
+        weights = [w * math.exp(bias * (stars - 3) * 0.35) for stars, w in enumerate(RATING_WEIGHTS, 1)]
+        rating_cum.append(list(accumulate(weights)))
+
+    start = datetime.combine(end - timedelta(days=days - 1), datetime.min.time())
+    day_weights = []
+    for day in range(days):
+        weight = 0.6 + 0.4 * day / days  # steady growth
+        if (start + timedelta(days=day)).weekday() >= 4:
+            weight *= 1.35
+        if rng.random() < 0.04:
+            weight *= rng.uniform(3, 8)
+        day_weights.append(weight)
+
+    return DatasetPlan(
+        seed=seed,
+        start=start,
+        days=days,
+        branch_ids=[b[0] for b in branches],
+        branch_cum=list(accumulate(popularity)),
+        rating_cum=rating_cum,
+        day_cum=list(accumulate(day_weights)),
+        staff=[b[2] for b in branches],
+        managers=[b[1] for b in branches],
+    )
+
+
+@lru_cache(maxsize=None)
+def review_templates():
+    """(title, content, sentiment) choices for every (rating, category) pair.
+
+    Generated texts come from the small phrase set above, so each one is
+    scored by the sentiment engine once up front instead of once per row.
+    """
+    templates = {}
+    for rating in range(1, 6):
+        if rating >= 4:
+            titles = POSITIVE_PHRASES
+        elif rating <= 2:
+            titles = NEGATIVE_PHRASES
+        else:
+            titles = NEUTRAL_PHRASES
+        for category, sentences in CATEGORY_PHRASES.items():
+            templates[rating, category] = [
+                (title, f"{title}. {sentence}", analyze_sentiment(rating, f"{title}. {sentence}", category))
+                for title in titles
+                for sentence in sentences
+            ]
+    return templates
+
+
+def synthesize_reviews(plan, chunk_index, count):
+    """Review rows for one chunk plus their rollup counters.
+
+    The same (plan, chunk_index) always gives the same rows. Counters are
+    keyed (branch_id, day, source, category), with day counted from
+    plan.start, and are listed in ANALYTICS_COUNTERS order.
+    """
+    rng = random.Random(plan.seed * 1_000_003 + chunk_index)
+    # rng.random() arithmetic instead of randrange/choice, which dominate the profile
+    rand = rng.random
+    templates = review_templates()
+    day_starts = [plan.start + timedelta(days=day) for day in range(plan.days)]
+    recent = plan.start + timedelta(days=plan.days - 2)
+    sources = rng.choices(list(SOURCE_WEIGHTS), list(SOURCE_WEIGHTS.values()), k=count)
+    categories = rng.choices(list(CATEGORY_WEIGHTS), list(CATEGORY_WEIGHTS.values()), k=count)
+    branches = rng.choices(range(len(plan.branch_ids)), cum_weights=plan.branch_cum, k=count)
+    days = rng.choices(range(plan.days), cum_weights=plan.day_cum, k=count)
+    hours = rng.choices(range(24), HOUR_WEIGHTS, k=count)
+
+    rows = []
+    rollups = {}
+    for branch, day, hour, source, category in zip(branches, days, hours, sources, categories):
+        rating_cum = plan.rating_cum[branch]
+        rating = bisect(rating_cum, rand() * rating_cum[-1]) + 1
+        choices = templates[rating, category]
+        title, content, sentiment = choices[int(rand() * len(choices))]
+        created_at = day_starts[day] + timedelta(seconds=hour * 3600 + int(rand() * 3600))
+
+        # Complaints get answered more often; the last two days are mostly unanswered
+        respond_rate = 0.75 if rating <= 2 else 0.45
+        if created_at >= recent:
+            respond_rate *= 0.3
+        responded = rand() < respond_rate
+        responded_at = created_at + timedelta(minutes=30 + int(rand() * 4290)) if responded else None
+
+        branch_id = plan.branch_ids[branch]
+        staff = plan.staff[branch]
+        customer_id = 100000 + int(rand() * 900000)
+        rows.append({
+            "branch_id": branch_id,
+            "rating": rating,
+            "title": title,
+            "content": content,
+            "source": source,
+            "category": category,
+            "sentiment": sentiment,
+            "customer_name": f"Customer {customer_id}",
+            "customer_email": f"customer{customer_id}@example.com",
+            "customer_phone": f"+91-9{100000000 + int(rand() * 900000000)}",
+            "staff_id": staff[int(rand() * len(staff))] if staff and rand() < 0.6 else None,
+            "is_responded": responded,
+            "response_text": RESPONSE_TEXTS[int(rand() * len(RESPONSE_TEXTS))] if responded else None,
+            "responded_by": plan.managers[branch] if responded else None,
+            "responded_at": responded_at,
+            "is_escalated": rating <= 2 and rand() < 0.2,
+            "created_at": created_at,
+            "updated_at": responded_at or created_at,
+        })
+
+        key = (branch_id, day, source, category)
+        counts = rollups.get(key)
+        if counts is None:
+            counts = rollups[key] = [0] * len(ANALYTICS_COUNTERS)
+        counts[0] += 1
+        counts[1] += rating
+        counts[SENTIMENT_COUNTERS[sentiment]] += 1
+        counts[5] += responded
+    return rows, rollups
+
+
+def _insert_dataset_rollups(conn, plan, rollups):
+    """Write merged synthesize_reviews counters as Analytics and AnalyticsBreakdown rows"""
+    daily = {}
+    breakdowns = {}
+    for (branch_id, day, source, category), counts in rollups.items():
+        for key, totals in (
+            ((branch_id, day), daily),
+            ((branch_id, day, "source", source), breakdowns),
+            ((branch_id, day, "category", category), breakdowns),
+        ):
+            acc = totals.setdefault(key, [0] * len(ANALYTICS_COUNTERS))
+            for i, count in enumerate(counts):
+                acc[i] += count
+
+    created_at = datetime.utcnow()
+    analytics_rows = []
+    for (branch_id, day), counts in daily.items():
+        row = dict(zip(ANALYTICS_COUNTERS, counts), branch_id=branch_id, date=plan.start.date() + timedelta(days=day))
+        row["avg_rating"] = row["rating_sum"] / row["total_reviews"]
+        row["response_rate"] = row["responded_count"] / row["total_reviews"] * 100
+        row["created_at"] = created_at
+        analytics_rows.append(row)
+    breakdown_rows = [
+        dict(zip(ANALYTICS_COUNTERS, counts), branch_id=branch_id, date=plan.start.date() + timedelta(days=day),
+             dimension=dimension, value=value)
+        for (branch_id, day, dimension, value), counts in breakdowns.items()
+    ]
+    if analytics_rows:
+        conn.execute(Analytics.__table__.insert(), analytics_rows)
+    if breakdown_rows:
+        conn.execute(AnalyticsBreakdown.__table__.insert(), breakdown_rows)
+
+
+def _create_dataset_accounts(num_branches, staff_per_branch):
+    """Branches plus an admin, a manager and staff per branch; returns (id, manager_id, staff_ids) per branch"""
+    # Every account shares one password, so it is hashed once
+    password_hash = password_hasher.hash(DATASET_PASSWORD)
+
+    db.session.add(User(email="admin@example.com", full_name="Admin User", role="admin",
+                        password_hash=password_hash))
+    branches = []
+    for i in range(1, num_branches + 1):
+        branch = Branch(name=f"Branch {i}", location=f"Location {i}", branch_code=f"BR{i:04}")
+        db.session.add(branch)
+        db.session.flush()
+        manager = User(email=f"manager{branch.id}@example.com", full_name=f"Branch {branch.id} Manager",
+                       role="manager", branch_id=branch.id, password_hash=password_hash)
+        staff = [
+            User(email=f"staff{branch.id}-{n}@example.com", full_name=f"Staff Member {branch.id}-{n}",
+                 role="staff", branch_id=branch.id, password_hash=password_hash)
+            for n in range(1, staff_per_branch + 1)
+        ]
+        db.session.add_all([manager, *staff])
+        db.session.flush()
+        branch.manager_id = manager.id
+        branches.append((branch.id, manager.id, [user.id for user in staff]))
+    db.session.commit()
+    return branches
+
+
+def generate_dataset(num_reviews=1_000_000, num_branches=50, days=365, seed=42, workers=1,
+                     chunk_size=20_000, staff_per_branch=3, end=None, progress=None):
+    """Fill an empty database with a deterministic, production-shaped dataset.
+
+    Rows are synthesized in chunks (in ``workers`` processes when > 1) and
+    written with batched Core inserts. The analytics rollups are summed up
+    while the rows are synthesized and written at the end, followed by the
+    branch counters. Must run inside
+    an app context. Returns the number of reviews inserted.
+    """
+    if db.session.query(Branch.id).first() or db.session.query(Review.id).first():
+        raise ValueError("Database is not empty")
+
+    end = end or datetime.utcnow().date()
+    branches = _create_dataset_accounts(num_branches, staff_per_branch)
+    plan = build_dataset_plan(seed, branches, days, end)
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def submit(chunk_index, count):
+        if executor:
+            return executor.submit(synthesize_reviews, plan, chunk_index, count)
+        future = Future()
+        future.set_result(synthesize_reviews(plan, chunk_index, count))
+        return future
+
+    engine = db.engine
+    sqlite = engine.dialect.name == "sqlite"
+    insert = Review.__table__.insert()
+    inserted = 0
+    rollups = {}
+    pending = deque()
+    with engine.connect() as conn:
+        if sqlite:
+            # The target is a throwaway load-test database; trade durability for speed
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            # Index the full-text table once at the end instead of per row
+            conn.exec_driver_sql("DROP TRIGGER IF EXISTS reviews_fts_ai")
+        # Building each secondary index once after the load is several times
+        # faster than maintaining it row by row
+        for index in Review.__table__.indexes:
+            index.drop(conn)
+        conn.commit()
+
+        def write(future):
+            nonlocal inserted
+            rows, chunk_rollups = future.result()
+            conn.execute(insert, rows)
+            for key, counts in chunk_rollups.items():
+                total = rollups.get(key)
+                if total is None:
+                    rollups[key] = counts
+                else:
+                    for i, count in enumerate(counts):
+                        total[i] += count
+            conn.commit()
+            inserted += len(rows)
+            if progress:
+                progress(inserted, num_reviews)
+
+        try:
+            for chunk_index, offset in enumerate(range(0, num_reviews, chunk_size)):
+                pending.append(submit(chunk_index, min(chunk_size, num_reviews - offset)))
+                if len(pending) > max(workers, 1) * 2:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            conn.rollback()
+            for index in Review.__table__.indexes:
+                index.create(conn)
+            if sqlite:
+                conn.exec_driver_sql(SQLITE_FTS_DDL[1])
+                conn.exec_driver_sql("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')")
+            conn.commit()
+
+        # Rollups come from the same counters as the rows, so they match exactly
+        _insert_dataset_rollups(conn, plan, rollups)
+        conn.commit()
+    store_branch_counts(count_branch_reviews())
+    db.session.commit()
+    return inserted
+
+
 if __name__ == "__main__":
     seed_database()
 
@@ -0,0 +1,209 @@
+"""
+Lexicon-based review sentiment.
+
+Texts are tokenized once with a precompiled pattern and matched against a
+token trie, so multi-word phrases ("would not recommend") and single words
+are found in one left-to-right pass. Words are matched whole ("goodbye" no
+longer counts as "good"), negators flip the polarity of the terms that
+follow them within a short window, and each review category can add its own
+terms on top of the shared lexicon.
+
+The star rating acts as a prior that the text can pull towards neutral, so a
+4-star review that complains about everything is no longer labelled
+positive.
+"""
+import re
+import time
+
+TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|[.!?;,]")
+CLAUSE_BREAKS = frozenset('.!?;,')
+NEGATORS = frozenset([
+    'not', 'no', 'never', 'nothing', 'hardly', 'without', 'nor',
+    'dont', 'didnt', 'doesnt', 'isnt', 'wasnt', 'werent', 'wont', 'cant', 'couldnt', 'wouldnt', 'shouldnt'
+])
+INTENSIFIERS = {'very': 1.5, 'really': 1.5, 'extremely': 2.0, 'super': 1.5, 'so': 1.3, 'too': 1.3, 'absolutely': 1.8}
+NEGATION_WINDOW = 3
+
+BASE_LEXICON = {
+    'excellent': 2, 'great': 1.5, 'good': 1, 'amazing': 2, 'wonderful': 2, 'fantastic': 2,
+    'love': 1.5, 'loved': 1.5, 'perfect': 2, 'awesome': 2, 'nice': 1, 'best': 1.5, 'friendly': 1,
+    'recommend': 1, 'highly recommended': 2, 'satisfied': 1, 'pleasant': 1, 'decent': 0.5,
+    'bad': -1, 'poor': -1.5, 'terrible': -2, 'awful': -2, 'hate': -2, 'worst': -2, 'horrible': -2,
+    'disgusting': -2, 'disappointing': -1.5, 'disappointed': -1.5, 'rude': -1.5, 'slow': -1,
+    'overpriced': -1, 'would not recommend': -2, 'never again': -2, 'waste of money': -2,
+    'could be better': -0.5, 'nothing special': -0.5,
+}
+
+CATEGORY_LEXICONS = {
+    'food': {
+        'delicious': 2, 'tasty': 1.5, 'flavorful': 1.5, 'fresh': 1, 'generous': 1, 'hot': 0.5,
+        'bland': -1, 'stale': -1.5, 'cold': -1, 'undercooked': -1.5, 'raw': -1, 'soggy': -1,
+        'unavailable': -0.5, 'inconsistent': -1,
+    },
+    'service': {
+        'attentive': 1.5, 'quick': 1, 'prompt': 1, 'efficient': 1, 'polite': 1,
+        'ignored': -1.5, 'waited': -0.5, 'delayed': -1, 'difficult': -1,
+    },
+    'staff': {
+        'courteous': 1.5, 'professional': 1.5, 'helpful': 1.5, 'welcoming': 1,
+        'unprofessional': -1.5, 'overwhelmed': -0.5, 'unwelcoming': -1.5,
+    },
+    'cleanliness': {
+        'clean': 1.5, 'spotless': 2, 'well maintained': 1.5, 'hygienic': 1.5,
+        'dirty': -2, 'filthy': -2, 'smelly': -1.5, 'trash': -1, 'unhygienic': -2,
+    },
+    'ambience': {
+        'cozy': 1.5, 'vibe': 1, 'comfortable': 1, 'spacious': 1, 'relaxing': 1,
+        'noisy': -1, 'cramped': -1, 'crowded': -0.5, 'dark': -0.5,
+    },
+}
+
+
+def tokenize(text):
+    """Lowercase word and clause-break tokens; apostrophes inside negations are dropped"""
+    tokens = TOKEN_RE.findall((text or '').lower())
+    return [t.replace("'", '') if t.endswith("n't") else t for t in tokens]
+
+
+class Lexicon:
+    """Terms compiled into a token trie for single-pass phrase matching"""
+
+    _WEIGHT = object()
+
+    def __init__(self, terms):
+        self.root = {}
+        for term, weight in terms.items():
+            node = self.root
+            for token in tokenize(term):
+                node = node.setdefault(token, {})
+            node[self._WEIGHT] = weight
+
+    def extend(self, terms):
+        merged = Lexicon({})
+        merged.root = _merge_tries(self.root, Lexicon(terms).root)
+        return merged
+
+    def matches(self, tokens):
+        """Yield (start, end, weight) for the longest term starting at each position"""
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = self.root.get(tokens[i])
+            best = None
+            j = i
+            while node is not None:
+                j += 1
+                if self._WEIGHT in node:
+                    best = (j, node[self._WEIGHT])
+                node = node.get(tokens[j]) if j < n else None
+            if best:
+                yield i, best[0], best[1]
+                i = best[0]
+            else:
+                i += 1
+
+
+def _merge_tries(a, b):
+    merged = dict(a)
+    for key, value in b.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_tries(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class SentimentEngine:
+    def __init__(self, lexicon=BASE_LEXICON, category_lexicons=CATEGORY_LEXICONS,
+                 rating_weight=1.5, threshold=1.0):
+        self.lexicon = Lexicon(lexicon)
+        self.category_lexicons = {
+            category: self.lexicon.extend(terms) for category, terms in category_lexicons.items()
+        }
+        self.rating_weight = rating_weight
+        self.threshold = threshold
+
+    def score_text(self, text, category=None):
+        """Signed polarity of text; positive numbers mean positive sentiment"""
+        tokens = tokenize(text)
+        lexicon = self.category_lexicons.get(category, self.lexicon)
+        score = 0.0
+        negated_until = -1
+        boost = 1.0
+        matches = {start: (end, weight) for start, end, weight in lexicon.matches(tokens)}
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in CLAUSE_BREAKS:
+                negated_until = -1
+                boost = 1.0
+                i += 1
+                continue
+            if i in matches:
+                end, weight = matches[i]
+                if i <= negated_until:
+                    # "not good" reads as negative, "not bad" only as mildly positive
+                    weight = -weight if weight > 0 else -weight * 0.5
+                score += weight * boost
+                boost = 1.0
+                i = end
+                continue
+            if token in NEGATORS:
+                negated_until = i + NEGATION_WINDOW
+            elif token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+            i += 1
+        return score
+
+    def score(self, rating, text, category=None):
+        prior = (rating - 3) * self.rating_weight if rating else 0.0
+        return prior + self.score_text(text, category)
+
+    def label(self, rating, text, category=None):
+        value = self.score(rating, text, category)
+        if value >= self.threshold:
+            return 'positive'
+        if value <= -self.threshold:
+            return 'negative'
+        return 'neutral'
+
+    def score_batch(self, texts, ratings, categories=None):
+        """Labels for parallel sequences of texts, ratings and (optional) categories"""
+        if categories is None:
+            categories = [None] * len(texts)
+        label = self.label
+        return [label(rating, text, category) for text, rating, category in zip(texts, ratings, categories)]
+
+
+default_engine = SentimentEngine()
+
+
+def analyze(rating, text, category=None):
+    return default_engine.label(rating, text, category)
+
+
+def score_batch(texts, ratings, categories=None):
+    return default_engine.score_batch(texts, ratings, categories)
+
+
+def benchmark(n=50000, batch_size=1000):
+    """Score synthetic reviews and return throughput in reviews/sec"""
+    samples = [
+        ('The dishes were flavorful and served hot. Staff were attentive and friendly.', 5, 'food'),
+        ('Service was a bit slow during peak hours, not great but not bad either.', 3, 'service'),
+        ('Washrooms could be cleaned more frequently. Would not recommend.', 2, 'cleanliness'),
+        ('Ambience was okay but a bit too noisy.', 3, 'ambience'),
+    ]
+    texts = [samples[i % len(samples)][0] for i in range(n)]
+    ratings = [samples[i % len(samples)][1] for i in range(n)]
+    categories = [samples[i % len(samples)][2] for i in range(n)]
+
+    start = time.perf_counter()
+    for i in range(0, n, batch_size):
+        score_batch(texts[i:i + batch_size], ratings[i:i + batch_size], categories[i:i + batch_size])
+    return n / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    print(f'{benchmark():,.0f} reviews/sec (single process)')
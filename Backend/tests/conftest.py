@@ -0,0 +1,68 @@
+"""
+Shared fixtures: the app module bound to a throwaway SQLite database filled
+with a small generated dataset.
+
+app.py reads its settings at import time, so the environment is set before
+it is imported.
+"""
+import os
+import tempfile
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix='review-app-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_DB_DIR, 'test.db').replace('\\', '/')
+os.environ.setdefault('JOB_BACKEND', 'database')
+
+import app as app_module  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def backend():
+    """The app module with tables created and a small dataset loaded"""
+    from seed_reviews import generate_dataset
+
+    with app_module.app.app_context():
+        app_module.db.drop_all()
+        app_module.db.create_all()
+        generate_dataset(num_reviews=300, num_branches=3, days=30, seed=7)
+        app_module.db.session.remove()
+    return app_module
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+def auth_headers(backend, user_id):
+    """Bearer headers for the user with this id"""
+    with backend.app.app_context():
+        user = backend.db.session.get(backend.User, user_id)
+        token = create_access_token(identity=str(user.id), additional_claims=backend.scope_claims(user))
+        backend.db.session.remove()
+    return {'Authorization': f'Bearer {token}'}
+
+
+def first_user_id(backend, role):
+    with backend.app.app_context():
+        user_id = backend.User.query.filter_by(role=role).order_by(backend.User.id).first().id
+        backend.db.session.remove()
+    return user_id
+
+
+@pytest.fixture
+def admin_headers(backend):
+    return auth_headers(backend, first_user_id(backend, 'admin'))
+
+
+@pytest.fixture
+def staff_headers(backend):
+    return auth_headers(backend, first_user_id(backend, 'staff'))
+
+
+def run_worker(backend):
+    """Apply every queued background job, like one pass of `flask worker --once`"""
+    result = backend.app.test_cli_runner().invoke(args=['worker', '--once'])
+    assert result.exit_code == 0, result.output
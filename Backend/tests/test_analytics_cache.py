@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _total_reviews(trends):
+    return sum(day['total'] for day in trends.values())
+
+
+def test_trends_cache_misses_after_worker_in_another_process_applies_rollups(client, admin_headers):
+    url = '/api/analytics/trends?days=2'
+    created = client.post('/api/reviews', json={'branch_id': 1, 'rating': 5, 'content': 'Lovely dinner.'})
+    assert created.status_code == 201
+
+    # The rollup job is still queued, so the new review is not counted yet
+    before = client.get(url, headers=admin_headers)
+    assert before.headers['X-Cache'] == 'MISS'
+    again = client.get(url, headers=admin_headers)
+    assert again.headers['X-Cache'] == 'HIT'
+    assert again.get_json() == before.get_json()
+
+    # A separate process never invalidates this process's in-memory cache
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'worker', '--once'],
+        cwd=BACKEND_DIR, env=dict(os.environ), check=True, capture_output=True
+    )
+
+    after = client.get(url, headers=admin_headers)
+    assert after.status_code == 200
+    assert after.headers['X-Cache'] == 'MISS'
+    assert _total_reviews(after.get_json()) == _total_reviews(before.get_json()) + 1
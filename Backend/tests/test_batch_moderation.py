@@ -0,0 +1,68 @@
+import pytest
+
+
+def _review_id(backend, **filters):
+    with backend.app.app_context():
+        review = backend.Review.query.filter_by(**filters).order_by(backend.Review.id).first()
+        backend.db.session.remove()
+    return review.id
+
+
+def _batch(client, headers, **body):
+    return client.post('/api/reviews/batch', json=body, headers=headers)
+
+
+def test_batch_re_respond_changes_the_reviews_etag(backend, client, admin_headers):
+    review_id = _review_id(backend, is_responded=False)
+    first = _batch(client, admin_headers, action='respond', review_ids=[review_id], response_text='Thanks!')
+    assert first.status_code == 200
+
+    before = client.get('/api/reviews', headers=admin_headers)
+    response = _batch(client, admin_headers, action='respond', review_ids=[review_id], response_text='Thank you again')
+    assert response.status_code == 200
+    assert response.get_json()['results'][0]['review']['response_text'] == 'Thank you again'
+
+    after = client.get('/api/reviews', headers=dict(admin_headers, **{'If-None-Match': before.headers['ETag']}))
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+
+
+def test_batch_reports_missing_and_unchanged_reviews(backend, client, admin_headers):
+    review_id = _review_id(backend, is_escalated=False)
+    response = _batch(client, admin_headers, action='escalate', review_ids=[review_id, 999999])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['updated'] == 1
+    assert [result['status'] for result in body['results']] == ['ok', 'not_found']
+    assert body['results'][0]['review']['is_escalated'] is True
+
+    again = _batch(client, admin_headers, action='escalate', review_ids=[review_id]).get_json()
+    assert again['updated'] == 0
+    assert again['results'][0]['status'] == 'unchanged'
+
+
+def test_batch_filter_selects_the_oldest_matching_reviews(client, admin_headers):
+    response = _batch(client, admin_headers, action='escalate', filter={'branch_id': 2, 'rating': 1, 'is_escalated': False})
+    assert response.status_code == 200
+    reviews = [result['review'] for result in response.get_json()['results']]
+    assert reviews
+    assert all(review['branch_id'] == 2 and review['rating'] == 1 for review in reviews)
+    assert reviews == sorted(reviews, key=lambda review: (review['created_at'], review['id']))
+
+
+@pytest.mark.parametrize('bad', [
+    {'branch_id': '1'},
+    {'rating': '5'},
+    {'rating': True},
+    {'is_responded': 'false'},
+    {'sentiment': ['negative']},
+])
+def test_batch_filter_values_are_type_checked(client, admin_headers, bad):
+    response = _batch(client, admin_headers, action='escalate', filter=bad)
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('filter.')
+
+
+def test_batch_respond_needs_text_or_template(client, admin_headers):
+    assert _batch(client, admin_headers, action='respond', review_ids=[1]).status_code == 400
+    assert _batch(client, admin_headers, action='archive', review_ids=[1]).status_code == 400
@@ -0,0 +1,84 @@
+import pytest
+
+
+def _counters(backend, branch_id=1):
+    """(stored counters, counters recomputed from reviews) for a branch"""
+    with backend.app.app_context():
+        branch = backend.db.session.get(backend.Branch, branch_id)
+        stored = {name: getattr(branch, name) for name in backend.BRANCH_COUNTERS}
+        counted = backend.count_branch_reviews([branch_id])[branch_id]
+        backend.db.session.remove()
+    return stored, dict(counted)
+
+
+def _review_id(backend, **filters):
+    with backend.app.app_context():
+        review_id = backend.Review.query.filter_by(branch_id=1, **filters).order_by(backend.Review.id).first().id
+        backend.db.session.remove()
+    return review_id
+
+
+def _changed(before, after):
+    return {name: after[name] - before[name] for name in before if after[name] != before[name]}
+
+
+def test_create_adds_the_review_to_its_branch(backend, client):
+    before, _ = _counters(backend)
+    response = client.post('/api/reviews', json={'branch_id': 1, 'rating': 4, 'content': 'Nice and quick.'})
+    assert response.status_code == 201
+    after, counted = _counters(backend)
+
+    sentiment = response.get_json()['review']['sentiment']
+    assert _changed(before, after) == {'total_reviews': 1, 'rating_sum': 4, f'{sentiment}_count': 1}
+    assert after == counted
+
+
+def test_respond_counts_only_the_first_response(backend, client, admin_headers):
+    review_id = _review_id(backend, is_responded=False)
+    before, _ = _counters(backend)
+    for text in ('Thanks!', 'Thanks again!'):
+        response = client.post(f'/api/reviews/{review_id}/respond', json={'response_text': text}, headers=admin_headers)
+        assert response.status_code == 200
+    after, counted = _counters(backend)
+    assert _changed(before, after) == {'responded_count': 1}
+    assert after == counted
+
+
+def test_escalate_counts_each_review_once(backend, client, admin_headers):
+    review_id = _review_id(backend, is_escalated=False)
+    before, _ = _counters(backend)
+    for _ in range(2):
+        assert client.post(f'/api/reviews/{review_id}/escalate', headers=admin_headers).status_code == 200
+    after, counted = _counters(backend)
+    assert _changed(before, after) == {'escalated_count': 1}
+    assert after == counted
+
+
+@pytest.mark.parametrize('action, filters, delta', [
+    ('respond', {'is_responded': False}, {'responded_count': 2}),
+    ('respond', {'is_responded': True}, {}),
+    ('escalate', {'is_escalated': False}, {'escalated_count': 2}),
+    ('unescalate', {'is_escalated': True}, {'escalated_count': -2}),
+])
+def test_batch_moderation_applies_counter_deltas(backend, client, admin_headers, action, filters, delta):
+    with backend.app.app_context():
+        review_ids = [review.id for review in backend.Review.query.filter_by(branch_id=1, **filters)
+                      .order_by(backend.Review.id).limit(2)]
+        backend.db.session.remove()
+    assert len(review_ids) == 2
+    before, _ = _counters(backend)
+
+    body = {'action': action, 'review_ids': review_ids}
+    if action == 'respond':
+        body['response_text'] = 'Thank you for the feedback.'
+    response = client.post('/api/reviews/batch', json=body, headers=admin_headers)
+    assert response.status_code == 200
+    after, counted = _counters(backend)
+    assert _changed(before, after) == delta
+    assert after == counted
+
+
+def test_branch_stats_check_reports_no_drift(backend):
+    result = backend.app.test_cli_runner().invoke(args=['branch-stats-check'])
+    assert result.exit_code == 0, result.output
+    assert 'match' in result.output
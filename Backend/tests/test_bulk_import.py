@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+VALID = {'branch_id': 1, 'rating': 4, 'content': 'Great service and food.', 'customer_email': 'a@example.com'}
+
+
+def _import(client, headers, rows):
+    response = client.post('/api/reviews/bulk', json=rows, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('bad', [
+    {'title': {'x': 1}},
+    {'source': 'g' * 51},
+    {'customer_phone': '+91' + '9' * 30},
+    {'customer_email': ['a@example.com']},
+    {'staff_id': 999999},
+    {'staff_id': True},
+])
+def test_bad_row_is_rejected_without_failing_the_rest(client, admin_headers, bad):
+    rows = [dict(VALID), dict(VALID), dict(VALID, **bad), dict(VALID)]
+    result = _import(client, admin_headers, rows)
+    assert result['inserted'] == 3
+    assert [error['index'] for error in result['errors']] == [2]
+
+
+def test_rejected_chunk_is_retried_row_by_row_with_generic_messages(backend, client, admin_headers, monkeypatch):
+    store = backend._store_review_rows
+
+    def reject_phone(rows):
+        if any(row['customer_phone'] == 'reject-me' for row in rows):
+            raise IntegrityError('INSERT INTO reviews ...', [rows], Exception('constraint failed'))
+        store(rows)
+
+    monkeypatch.setattr(backend, '_store_review_rows', reject_phone)
+    rows = [dict(VALID), dict(VALID, customer_phone='reject-me'), dict(VALID)]
+    result = _import(client, admin_headers, rows)
+
+    assert result['inserted'] == 2
+    assert result['errors'] == [{'index': 1, 'message': backend.BULK_ROW_REJECTED}]
+    assert 'a@example.com' not in str(result)
@@ -0,0 +1,69 @@
+import pytest
+
+
+def _review_id(backend, **filters):
+    with backend.app.app_context():
+        review_id = backend.Review.query.filter_by(**filters).order_by(backend.Review.id).first().id
+        backend.db.session.remove()
+    return review_id
+
+
+def _revalidate(client, headers, url):
+    """(status of a conditional re-request, ETag of the first response)"""
+    etag = client.get(url, headers=headers).headers['ETag']
+    return client.get(url, headers=dict(headers, **{'If-None-Match': etag})).status_code, etag
+
+
+@pytest.mark.parametrize('url', [
+    '/api/reviews', '/api/reviews?branch_id=1&per_page=5', '/api/branches', '/api/branches?with_stats=1',
+    '/api/templates', '/api/analytics/dashboard', '/api/analytics/trends', '/api/analytics/staff'
+])
+def test_unchanged_resources_answer_304(client, admin_headers, url):
+    assert _revalidate(client, admin_headers, url)[0] == 304
+
+
+def test_not_modified_skips_the_list_queries(client, admin_headers):
+    etag = client.get('/api/reviews', headers=admin_headers).headers['ETag']
+    response = client.get('/api/reviews', headers=dict(admin_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 304
+    assert response.data == b''
+    assert '"1 queries"' in response.headers['Server-Timing']
+
+
+@pytest.mark.parametrize('write', ['create', 'respond', 're-respond', 'escalate'])
+def test_review_writes_change_the_etags(backend, client, admin_headers, write):
+    review_id = _review_id(backend, branch_id=1, is_responded=write == 're-respond', is_escalated=False)
+    urls = ['/api/reviews', '/api/branches?with_stats=1', '/api/analytics/dashboard']
+    before = {url: _revalidate(client, admin_headers, url)[1] for url in urls}
+
+    if write == 'create':
+        response = client.post('/api/reviews', json={'branch_id': 1, 'rating': 2, 'content': 'Cold food.'})
+    elif write == 'escalate':
+        response = client.post(f'/api/reviews/{review_id}/escalate', headers=admin_headers)
+    else:
+        response = client.post(f'/api/reviews/{review_id}/respond', json={'response_text': f'Reply to {write}'},
+                               headers=admin_headers)
+    assert response.status_code in (200, 201)
+
+    for url, etag in before.items():
+        response = client.get(url, headers=dict(admin_headers, **{'If-None-Match': etag}))
+        assert response.status_code == 200, url
+        assert response.headers['ETag'] != etag
+
+
+def test_template_edit_changes_the_templates_etag(client, admin_headers):
+    response = client.post('/api/templates', json={'name': 'Hi', 'template_text': 'Hi {customer_name}'},
+                           headers=admin_headers)
+    template_id = response.get_json()['template']['id']
+    etag = client.get('/api/templates', headers=admin_headers).headers['ETag']
+
+    assert client.put(f'/api/templates/{template_id}', json={'name': 'Hello'}, headers=admin_headers).status_code == 200
+    response = client.get('/api/templates', headers=dict(admin_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert 'Hello' in [template['name'] for template in response.get_json()]
+
+
+def test_etags_differ_per_query_string(client, admin_headers):
+    first = client.get('/api/reviews?per_page=5', headers=admin_headers).headers['ETag']
+    second = client.get('/api/reviews?per_page=6', headers=admin_headers).headers['ETag']
+    assert first != second
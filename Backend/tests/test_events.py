@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from tests.conftest import run_worker
+
+
+def _add_event(backend, created_at=None, id=None):
+    row = backend.StreamEvent(kind='review.created', branch_id=1, payload={}, created_at=created_at or datetime.utcnow())
+    if id is not None:
+        row.id = id
+    backend.db.session.add(row)
+    backend.db.session.commit()
+    return row.id
+
+
+def test_worker_prunes_old_events_without_open_streams(backend):
+    retention = backend.app.config['EVENTS_RETENTION']
+    with backend.app.app_context():
+        old = _add_event(backend, datetime.utcnow() - timedelta(seconds=retention + 60))
+        recent = _add_event(backend)
+        backend.db.session.remove()
+    assert not backend.event_bus.started
+    for task in backend.job_queue.periodic:
+        task[2] = None
+
+    run_worker(backend)
+
+    with backend.app.app_context():
+        assert backend.db.session.get(backend.StreamEvent, old) is None
+        assert backend.db.session.get(backend.StreamEvent, recent) is not None
+        backend.db.session.remove()
+
+
+def test_poll_picks_up_ids_that_commit_out_of_order(backend):
+    events = backend.DatabaseEventBackend(backend.db, backend.StreamEvent)
+    with backend.app.app_context():
+        engine = backend.db.engine
+        with engine.connect() as conn:
+            events.poll_once(conn)
+        start = events.last_id
+        _add_event(backend, id=start + 1)
+        _add_event(backend, id=start + 3)
+        with engine.connect() as conn:
+            assert [e['id'] for e in events.poll_once(conn)] == [start + 1, start + 3]
+
+        # start + 2 was inserted first but committed last
+        _add_event(backend, id=start + 2)
+        with engine.connect() as conn:
+            assert [e['id'] for e in events.poll_once(conn)] == [start + 2]
+            assert events.poll_once(conn) == []
+        backend.db.session.remove()
@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+
+from tests.conftest import run_worker
+
+
+def _rollup(backend, branch_id, day):
+    with backend.app.app_context():
+        row = backend.Analytics.query.filter_by(branch_id=branch_id, date=day).first()
+        counted = backend.Review.query.filter(
+            backend.Review.branch_id == branch_id,
+            backend.db.func.date(backend.Review.created_at) == day.isoformat()
+        ).count()
+        backend.db.session.remove()
+    return (row.total_reviews if row else 0), counted
+
+
+def _backfill(backend, start, end=None):
+    return backend.app.test_cli_runner().invoke(
+        args=['analytics-backfill', '--start', start.isoformat(), '--end', (end or start).isoformat(), '--branch-id', '1']
+    )
+
+
+def _create_review(client):
+    response = client.post('/api/reviews', json={'branch_id': 1, 'rating': 5, 'content': 'Lovely evening.'})
+    assert response.status_code == 201
+
+
+def _queued_rollups(backend):
+    with backend.app.app_context():
+        jobs = backend.Job.query.filter_by(kind='analytics.rollup', coalesce_key='branch:1').all()
+        payloads = [(job.status, [row[0] for row in job.payload['rows']]) for job in jobs]
+        backend.db.session.remove()
+    return payloads
+
+
+def test_worker_applies_each_queued_delta_once(backend, client):
+    run_worker(backend)
+    today = datetime.utcnow().date()
+    before, _ = _rollup(backend, 1, today)
+    _create_review(client)
+    _create_review(client)
+    assert _rollup(backend, 1, today)[0] == before
+
+    run_worker(backend)
+    assert _rollup(backend, 1, today)[0] == before + 2
+    run_worker(backend)
+    assert _rollup(backend, 1, today)[0] == before + 2
+    assert _queued_rollups(backend) == []
+
+
+def test_backfill_drops_queued_deltas_it_recomputes(backend, client):
+    run_worker(backend)
+    _create_review(client)
+    today = datetime.utcnow().date()
+
+    result = _backfill(backend, today)
+    assert result.exit_code == 0, result.output
+    assert _queued_rollups(backend) == []
+    run_worker(backend)
+
+    stored, counted = _rollup(backend, 1, today)
+    assert stored == counted
+
+
+def test_backfill_keeps_queued_deltas_for_other_days(backend):
+    day, other = date(2020, 1, 1), date(2020, 1, 2)
+    with backend.app.app_context():
+        backend.job_queue.enqueue('analytics.rollup', {'branch_id': 1, 'rows': [
+            [day.isoformat(), 'google', 'food', {'total_reviews': 1}],
+            [other.isoformat(), 'google', 'food', {'total_reviews': 1}]
+        ]}, coalesce_key='branch:1')
+        backend.db.session.commit()
+        backend.db.session.remove()
+
+    result = _backfill(backend, day)
+    assert result.exit_code == 0, result.output
+    assert _queued_rollups(backend) == [('pending', [other.isoformat()])]
+
+    run_worker(backend)
+    assert _rollup(backend, 1, other)[0] == 1
+
+
+def test_backfill_refuses_while_a_worker_applies_the_same_days(backend, client):
+    run_worker(backend)
+    _create_review(client)
+    with backend.app.app_context():
+        backend.Job.query.filter_by(kind='analytics.rollup').update({'status': 'running', 'locked_at': datetime.utcnow()})
+        backend.db.session.commit()
+        backend.db.session.remove()
+
+    result = _backfill(backend, datetime.utcnow().date())
+    assert result.exit_code != 0
+    assert 'retry' in result.output
+    assert [status for status, _ in _queued_rollups(backend)] == ['running']
+
+    with backend.app.app_context():
+        backend.Job.query.filter_by(kind='analytics.rollup').update(
+            {'status': 'pending', 'locked_at': None, 'run_at': datetime.utcnow() - timedelta(seconds=1)}
+        )
+        backend.db.session.commit()
+        backend.db.session.remove()
+    run_worker(backend)
+
+
+def test_failed_handler_is_retried_and_then_marked_failed(backend, monkeypatch):
+    calls = []
+
+    def flaky(payloads):
+        calls.append(payloads)
+        raise ValueError('boom')
+
+    monkeypatch.setitem(backend.job_queue.handlers, 'test.flaky', flaky)
+    monkeypatch.setattr(backend.job_queue, 'retry_delay', lambda attempts: -1)
+    with backend.app.app_context():
+        backend.job_queue.enqueue('test.flaky', {'n': 1}, coalesce_key='flaky')
+        backend.job_queue.enqueue('test.flaky', {'n': 2}, coalesce_key='flaky')
+        backend.db.session.commit()
+
+        for _ in range(backend.job_queue.max_attempts + 2):
+            backend.job_queue.run_batch()
+
+        jobs = backend.Job.query.filter_by(kind='test.flaky').all()
+        assert [(job.status, job.attempts) for job in jobs] == [('failed', backend.job_queue.max_attempts)] * 2
+        assert 'ValueError: boom' in jobs[0].last_error
+        backend.Job.query.filter_by(kind='test.flaky').delete()
+        backend.db.session.commit()
+        backend.db.session.remove()
+
+    # Coalesced payloads arrive together, once per attempt
+    assert calls == [[{'n': 1}, {'n': 2}]] * backend.job_queue.max_attempts
@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from passwords import HasherBusy, PasswordHasher
+
+
+def test_timed_out_task_keeps_its_slot_until_it_finishes():
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout=0.2)
+    try:
+        # Warm the pool so process start-up does not eat the timeout
+        hasher._run(time.sleep, 0)
+        with pytest.raises(HasherBusy, match='Timed out'):
+            hasher._run(time.sleep, 2)
+        with pytest.raises(HasherBusy, match='Too many'):
+            hasher._run(time.sleep, 0)
+        deadline = time.monotonic() + 10
+        while not hasher._slots.acquire(blocking=False):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        hasher._slots.release()
+        hasher._run(time.sleep, 0)
+    finally:
+        hasher.shutdown()
+
+
+def test_slot_is_released_when_the_call_fails():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    try:
+        with pytest.raises(TypeError):
+            hasher._run(time.sleep, 'soon')
+        hasher._run(time.sleep, 0)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,26 @@
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+def _queries(response):
+    return int(re.search(r'(\d+) queries', response.headers['Server-Timing']).group(1))
+
+
+def test_create_review_publishes_its_event_without_extra_loads(backend, client):
+    response = client.post('/api/reviews', json={'branch_id': 1, 'rating': 4, 'content': 'Friendly staff.'})
+    assert response.status_code == 201
+    assert response.get_json()['review']['branch_name'] == 'Branch 1'
+    # Review, rollup job, branch name, branch version/counters, stream event
+    assert _queries(response) == 5
+
+
+def test_failed_statement_does_not_leave_a_query_timer(backend):
+    with backend.app.app_context(), backend.db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+            conn.rollback()
+        assert conn.info['query_started'] == []
@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.parametrize('per_page, expected', [('0', 1), ('-1', 1), ('-50', 1), ('5', 5), ('1000', 100)])
+def test_per_page_is_clamped(client, admin_headers, per_page, expected):
+    response = client.get(f'/api/reviews?per_page={per_page}', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['reviews']) == expected
+
+
+@pytest.mark.parametrize('per_page, expected', [('0', 1), ('-1', 1), ('1000', 100)])
+def test_per_page_is_clamped_in_cursor_mode(client, admin_headers, per_page, expected):
+    response = client.get(f'/api/reviews?cursor=&per_page={per_page}', headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['reviews']) == expected
+    assert body['next_cursor']
+
+
+def test_page_below_one_is_the_first_page(client, admin_headers):
+    first = client.get('/api/reviews?page=1', headers=admin_headers).get_json()
+    response = client.get('/api/reviews?page=-3', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['reviews'] == first['reviews']
+    assert response.get_json()['current_page'] == 1
@@ -0,0 +1,35 @@
+import json
+from datetime import datetime, timedelta
+
+NUMERIC_FIELDS = ('avg_rating', 'avg_response_seconds', 'median_response_seconds', 'p90_response_seconds')
+
+
+def test_staff_stats_are_plain_numbers_when_the_database_returns_decimals(backend, client, admin_headers,
+                                                                          monkeypatch):
+    response_seconds = backend.response_seconds
+    # Numeric expressions come back as Decimal, like AVG and EXTRACT on PostgreSQL
+    monkeypatch.setattr(backend, 'response_seconds',
+                        lambda: backend.db.cast(response_seconds(), backend.db.Numeric(14, 3)))
+    with backend.app.app_context():
+        review_id = backend.Review.query.filter_by(is_responded=False).first().id
+        backend.db.session.remove()
+    response = client.post(f'/api/reviews/{review_id}/respond', json={'response_text': 'Thanks!'},
+                           headers=admin_headers)
+    assert response.status_code == 200
+
+    with backend.app.app_context():
+        branch_ids = [b for (b,) in backend.db.session.query(backend.Branch.id)]
+        today = datetime.utcnow().date()
+        staff = backend.staff_performance(branch_ids, today - timedelta(days=365), today)
+        backend.db.session.remove()
+    assert any(row['responses'] for row in staff)
+    for row in staff:
+        for name in NUMERIC_FIELDS:
+            assert row[name] is None or type(row[name]) is float, (name, row[name])
+    # What RedisCacheBackend stores
+    json.dumps(staff)
+
+    body = client.get('/api/analytics/staff?days=365', headers=admin_headers).get_json()
+    for row in body['staff']:
+        for name in NUMERIC_FIELDS:
+            assert row[name] is None or isinstance(row[name], (int, float))
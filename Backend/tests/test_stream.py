@@ -0,0 +1,27 @@
+def _stream_token(client, headers):
+    response = client.post('/api/stream/token', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['token']
+
+
+def test_stream_opens_with_a_stream_token(client, admin_headers):
+    token = _stream_token(client, admin_headers)
+    response = client.get(f'/api/stream?jwt={token}', buffered=False)
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert next(response.response) == b'retry: 5000\n\n'
+    finally:
+        response.close()
+
+
+def test_stream_rejects_the_access_token(client, admin_headers):
+    access_token = admin_headers['Authorization'].split()[1]
+    assert client.get(f'/api/stream?jwt={access_token}').status_code in (400, 401, 422)
+    assert client.get('/api/stream', headers=admin_headers).status_code in (400, 401, 422)
+
+
+def test_stream_token_is_not_an_access_token(client, admin_headers):
+    token = _stream_token(client, admin_headers)
+    response = client.get('/api/reviews', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code in (400, 401, 422)
@@ -0,0 +1,72 @@
+import pytest
+
+
+def _create(client, headers, **fields):
+    body = dict({'name': 'Thanks', 'template_text': 'Thank you {customer_name}!'}, **fields)
+    response = client.post('/api/templates', json=body, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['template']['id']
+
+
+def _review(backend, **filters):
+    with backend.app.app_context():
+        review = backend.Review.query.filter_by(**filters).order_by(backend.Review.id).first()
+        values = {'id': review.id, 'customer_name': review.customer_name or 'valued customer'}
+        backend.db.session.remove()
+    return values
+
+
+def test_staff_cannot_edit_someone_elses_template(client, admin_headers, staff_headers):
+    template_id = _create(client, admin_headers)
+    for body in ({'template_text': 'Go away.'}, {'is_active': False}):
+        response = client.put(f'/api/templates/{template_id}', json=body, headers=staff_headers)
+        assert response.status_code == 403
+    assert client.put(f'/api/templates/{template_id}', json={'name': 'Thanks!'}, headers=admin_headers).status_code == 200
+
+
+def test_author_can_edit_their_template(client, staff_headers):
+    template_id = _create(client, staff_headers)
+    response = client.put(f'/api/templates/{template_id}', json={'name': 'Warm thanks'}, headers=staff_headers)
+    assert response.status_code == 200
+    assert response.get_json()['template']['name'] == 'Warm thanks'
+
+
+@pytest.mark.parametrize('body', [
+    {'name': ''},
+    {'name': 7},
+    {'template_text': '   '},
+    {'template_text': ['Thanks']},
+    {'template_text': 'Hello {manager}'},
+    {'is_active': 'false'},
+    {'category': 3},
+])
+def test_update_rejects_invalid_values(client, admin_headers, body):
+    template_id = _create(client, admin_headers)
+    response = client.put(f'/api/templates/{template_id}', json=body, headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_batch_respond_renders_the_updated_template(backend, client, admin_headers):
+    template_id = _create(client, admin_headers)
+    response = client.put(f'/api/templates/{template_id}', headers=admin_headers,
+                          json={'template_text': 'Dear {customer_name}, {{thanks}} from {branch_name}.'})
+    assert response.status_code == 200
+    review = _review(backend, is_responded=False, branch_id=1)
+
+    response = client.post('/api/reviews/batch', headers=admin_headers,
+                           json={'action': 'respond', 'review_ids': [review['id']], 'template_id': template_id})
+    assert response.status_code == 200
+    text = response.get_json()['results'][0]['review']['response_text']
+    assert text == f"Dear {review['customer_name']}, {{thanks}} from Branch 1."
+
+
+def test_deactivated_template_is_not_used_or_suggested(backend, client, admin_headers):
+    template_id = _create(client, admin_headers, name='Retired')
+    assert client.put(f'/api/templates/{template_id}', json={'is_active': False}, headers=admin_headers).status_code == 200
+    review = _review(backend, branch_id=1)
+
+    response = client.post('/api/reviews/batch', headers=admin_headers,
+                           json={'action': 'respond', 'review_ids': [review['id']], 'template_id': template_id})
+    assert response.status_code == 404
+    suggestions = client.get(f"/api/templates/suggest?review_id={review['id']}&limit=20", headers=admin_headers)
+    assert template_id not in [suggestion['id'] for suggestion in suggestions.get_json()['suggestions']]
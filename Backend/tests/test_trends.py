@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize('days, same_as', [(10 ** 9, 730), (100000, 730), (0, 1), (-30, 1)])
+def test_trend_window_is_clamped(client, admin_headers, days, same_as):
+    response = client.get(f'/api/analytics/trends?days={days}', headers=admin_headers)
+    assert response.status_code == 200
+    expected = client.get(f'/api/analytics/trends?days={same_as}', headers=admin_headers)
+    assert response.get_json() == expected.get_json()
+
+
+@pytest.mark.parametrize('days', [10 ** 9, -1])
+def test_staff_window_is_clamped(client, admin_headers, days):
+    response = client.get(f'/api/analytics/staff?days={days}', headers=admin_headers)
+    assert response.status_code == 200
@@ -317,6 +317,62 @@ function ReviewsPage({ token, user, onAuthError }) {
     fetchReviews();
   }, [filters, page]);
 
+  // Live updates from /api/stream patch the visible page instead of refetching it
+  useEffect(() => {
+    if (!token || typeof EventSource === 'undefined') return;
+    let source = null;
+    let stopped = false;
+    // EventSource cannot send headers, so the stream is opened with a
+    // short-lived stream token rather than the access token
+    const connect = async () => {
+      try {
+        const response = await fetch(`${API_BASE_URL}/stream/token`, {
+          method: 'POST',
+          headers: { 'Authorization': `Bearer ${token}` },
+        });
+        if (!response.ok || stopped) return;
+        const { token: streamToken } = await response.json();
+        source = new EventSource(`${API_BASE_URL}/stream?jwt=${encodeURIComponent(streamToken)}`);
+      } catch (err) {
+        return;
+      }
+      const onChanged = (e) => patchReview(JSON.parse(e.data).review);
+      source.addEventListener('review.responded', onChanged);
+      source.addEventListener('review.escalated', onChanged);
+      source.addEventListener('review.unescalated', onChanged);
+      source.addEventListener('review.created', (e) => {
+        const { review } = JSON.parse(e.data);
+        if (page === 1 && matchesFilters(review)) {
+          setReviews((prev) => [review, ...prev.filter((r) => r.id !== review.id)].slice(0, 10));
+        }
+      });
+      // Bulk imports and missed or dropped events need a fresh page
+      source.addEventListener('reviews.imported', () => fetchReviews());
+      source.addEventListener('reset', () => fetchReviews());
+      // The browser's own reconnect reuses the expired stream token; get a new one
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !stopped) {
+          setTimeout(connect, 5000);
+        }
+      };
+    };
+    connect();
+    return () => {
+      stopped = true;
+      if (source) source.close();
+    };
+  }, [token, filters, page]);
+
+  const matchesFilters = (review) =>
+    (!filters.sentiment || review.sentiment === filters.sentiment) &&
+    (!filters.category || review.category === filters.category) &&
+    (!filters.source || review.source === filters.source) &&
+    (!filters.branchId || String(review.branch_id) === String(filters.branchId));
+
+  const patchReview = (updated) => {
+    setReviews((prev) => prev.map((r) => (r.id === updated.id ? { ...r, ...updated } : r)));
+  };
+
   const fetchReviews = async () => {
     try {
       const params = new URLSearchParams({
@@ -356,9 +412,10 @@ function ReviewsPage({ token, user, onAuthError }) {
       });
 
       if (response.ok) {
+        const data = await response.json();
         setResponseText('');
         setSelectedReview(null);
-        fetchReviews();
+        patchReview(data.review);
       }
     } catch (err) {
       console.error('Error responding to review:', err);
@@ -373,7 +430,8 @@ function ReviewsPage({ token, user, onAuthError }) {
       });
 
       if (response.ok) {
-        fetchReviews();
+        const data = await response.json();
+        patchReview(data.review);
       }
     } catch (err) {
       console.error('Error escalating review:', err);